@@ -1,5 +1,8 @@
 from .guillotine import GuillotineBafMaxas
 from .maxrects import MaxRectsBl, MaxRectsBssf, MaxRectsBaf, MaxRectsBlsf
 from .skyline import SkylineBl
-from .packer import SORT_AREA, SORT_NONE
-from .packer import PackerBFF, newPacker
\ No newline at end of file
+from .shelf import ShelfNf
+from .packer import SortAlgo, SORT_AREA, SORT_PERI, SORT_LSIDE, SORT_NONE
+from .packer import PackerBFF, PackerBBF, PackerBWF, newPacker
+from .packer import PackingMode, PackerOnline, PackerOnlineBFF, PackerOnlineBBF, PackerOnlineBWF
+from .result import PackingResult
\ No newline at end of file
@@ -0,0 +1,214 @@
+import math
+import numpy as np
+from .preprocess import fits_matrix
+
+try:
+    from ortools.linear_solver import pywraplp
+except ImportError:  # The LP bound is optional
+    pywraplp = None
+
+
+def area_bound(items, trucks):
+    """
+    Cost of covering the total item area with trucks taken from the lowest
+    cost per unit of area, allowing a fraction of the last one. A fractional
+    knapsack, O(K log K).
+
+    Arguments:
+        items (array_like): N x 2 item widths and heights
+        trucks (array_like): K x 3 truck widths, heights and costs
+
+    Returns:
+        float: Lower bound
+    """
+    items = np.asarray(items).reshape(-1, 2)
+    trucks = np.asarray(trucks).reshape(-1, 3)
+
+    item_area = float((items[:, 0] * items[:, 1]).sum())
+    area = (trucks[:, 0] * trucks[:, 1]).astype(float)
+    order = np.argsort(trucks[:, 2] / area, kind='stable')
+    area, cost = area[order], trucks[order, 2].astype(float)
+
+    # Trucks fully used, then the fraction of the next one
+    covered = np.cumsum(area)
+    full = int(np.searchsorted(covered, item_area))
+    bound = cost[:full].sum()
+    if full < len(area):
+        left = item_area - (covered[full - 1] if full > 0 else 0)
+        bound += cost[full] * left / area[full]
+
+    return bound
+
+
+def fitting_area_bound(items, trucks, fits):
+    """
+    Every item area is paid at least at the lowest cost per unit of area
+    among the trucks it fits in. The trucks used cost their area times
+    their rate, and hold the area of their items, so this doesn't exceed
+    the cost of any packing.
+
+    Arguments:
+        items (array_like): N x 2 item widths and heights
+        trucks (array_like): K x 3 truck widths, heights and costs
+        fits (numpy.ndarray): N x K fits matrix, see fits_matrix()
+
+    Returns:
+        float: Lower bound
+    """
+    items = np.asarray(items).reshape(-1, 2)
+    trucks = np.asarray(trucks).reshape(-1, 3)
+
+    rate = trucks[:, 2] / (trucks[:, 0] * trucks[:, 1])
+    item_rate = np.where(fits, rate[None, :], np.inf).min(axis=1)
+    return float((items[:, 0] * items[:, 1] * item_rate).sum())
+
+
+def large_items_bound(items, trucks, fits, rotation=True):
+    """
+    Items no two of which can share a truck each need their own one. Two
+    items can't share a truck when their areas add up to more than the
+    largest truck area, or, when they can be rotated, their short sides add
+    up to more than the longest truck side. Each such set is bounded by the
+    cheapest truck each item fits in, and by the cheapest trucks in number
+    of items.
+
+    Arguments:
+        items (array_like): N x 2 item widths and heights
+        trucks (array_like): K x 3 truck widths, heights and costs
+        fits (numpy.ndarray): N x K fits matrix, see fits_matrix()
+        rotation (bool): Items can be rotated
+
+    Returns:
+        float: Lower bound, 0 if there are no large items
+    """
+    items = np.asarray(items).reshape(-1, 2)
+    trucks = np.asarray(trucks).reshape(-1, 3)
+
+    cost = trucks[:, 2].astype(float)
+    item_area = items[:, 0] * items[:, 1]
+
+    large_sets = [item_area * 2 > (trucks[:, 0] * trucks[:, 1]).max()]
+    if rotation:
+        large_sets.append(items.min(axis=1) * 2 > trucks[:, :2].max())
+
+    bound = 0.0
+    for large in large_sets:
+        count = int(large.sum())
+        if count == 0:
+            continue
+
+        min_cost = np.where(fits[large], cost[None, :], np.inf).min(axis=1)
+        usable = fits[large].any(axis=0)
+        cheapest = np.sort(cost[usable])[:count].sum()
+        bound = max(bound, min_cost.sum(), cheapest)
+
+    return bound
+
+
+def lp_bound(items, trucks, fits, time_limit=10):
+    """
+    Linear relaxation of the assignment of item area to trucks, with items
+    of the same size and identical trucks grouped:
+        min sum(c_k y_k)
+        sum_k x_gk = n_g                   (every item is assigned)
+        sum_g a_g x_gk <= A_k y_k           (truck area)
+        0 <= y_k <= m_k, x_gk >= 0 only where the items of g fit in k
+    It combines the truck counts of area_bound() with the fits of
+    fitting_area_bound(). Requires ortools, and is much slower than the
+    other bounds on large instances.
+
+    Arguments:
+        items (array_like): N x 2 item widths and heights
+        trucks (array_like): K x 3 truck widths, heights and costs
+        fits (numpy.ndarray): N x K fits matrix, see fits_matrix()
+        time_limit (float): Solver time limit in seconds
+
+    Returns:
+        float: Lower bound
+        None: ortools isn't installed or the LP wasn't solved to optimality
+    """
+    if pywraplp is None:
+        return None
+
+    items = np.asarray(items).reshape(-1, 2)
+    trucks = np.asarray(trucks).reshape(-1, 3)
+
+    # Group items by size and trucks by dimensions and cost, the fits of a
+    # group are the ones of its first member.
+    _, item_first, item_count = np.unique(items, axis=0, return_index=True, return_counts=True)
+    _, truck_first, truck_count = np.unique(trucks, axis=0, return_index=True, return_counts=True)
+    group_fits = fits[np.ix_(item_first, truck_first)]
+    item_area = (items[item_first, 0] * items[item_first, 1]).tolist()
+    truck_area = (trucks[truck_first, 0] * trucks[truck_first, 1]).tolist()
+    truck_cost = trucks[truck_first, 2].tolist()
+
+    solver = pywraplp.Solver.CreateSolver('GLOP')
+    if solver is None:
+        return None
+    solver.SetTimeLimit(int(time_limit * 1000))
+
+    y = [solver.NumVar(0, int(m), f'y_{k}') for k, m in enumerate(truck_count.tolist())]
+    x = {(g, k): solver.NumVar(0, solver.infinity(), f'x_{g}_{k}')
+         for g, k in zip(*np.nonzero(group_fits))}
+
+    group_vars = [[] for _ in item_first]
+    truck_vars = [[] for _ in truck_first]
+    for (g, k), var in x.items():
+        group_vars[g].append(var)
+        truck_vars[k].append((item_area[g], var))
+
+    for g, count in enumerate(item_count.tolist()):
+        solver.Add(solver.Sum(group_vars[g]) == count)
+    for k, area in enumerate(truck_area):
+        solver.Add(solver.Sum([a * var for a, var in truck_vars[k]]) <= area * y[k])
+
+    solver.Minimize(solver.Sum([c * var for c, var in zip(truck_cost, y)]))
+    if solver.Solve() != pywraplp.Solver.OPTIMAL:
+        return None
+
+    # Small margin for the LP tolerances
+    return solver.Objective().Value() * (1 - 1e-9)
+
+
+def lower_bound(items, trucks, rotation=True, fits=None, lp=False):
+    """
+    Best of the lower bounds above, rounded up when truck costs are
+    integers. The area bounds run in a few milliseconds for thousands of
+    items and trucks.
+
+    Arguments:
+        items (array_like): N x 2 item widths and heights
+        trucks (array_like): K x 3 truck widths, heights and costs
+        rotation (bool): Items can be rotated
+        fits (numpy.ndarray): Optional N x K fits matrix, built if None
+        lp (bool): Also solve the LP bound, when ortools is installed
+
+    Returns:
+        int, float: Lower bound on the cost of any packing
+    """
+    items = np.asarray(items).reshape(-1, 2)
+    trucks = np.asarray(trucks).reshape(-1, 3)
+    if len(items) == 0:
+        return 0
+    if fits is None:
+        fits = fits_matrix(items[:, 0], items[:, 1], trucks[:, 0], trucks[:, 1], rotation)
+
+    bound = max(area_bound(items, trucks),
+                fitting_area_bound(items, trucks, fits),
+                large_items_bound(items, trucks, fits, rotation))
+    if lp:
+        bound = max(bound, lp_bound(items, trucks, fits) or 0)
+
+    if np.issubdtype(trucks.dtype, np.integer) and math.isfinite(bound):
+        return math.ceil(bound - 1e-6)
+    return bound
+
+
+def gap(cost, bound):
+    """
+    Relative gap between a cost and a lower bound, 0 when the cost is
+    proven optimal.
+    """
+    if cost is None or cost <= bound:
+        return 0.0
+    return (cost - bound) / cost
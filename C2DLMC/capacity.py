@@ -0,0 +1,137 @@
+class CapacityTree(object):
+    """
+    Max segment tree over the open bins of a packer.
+
+    Every leaf (slot) stores the capacity bounds (width, height, area) of one
+    bin, and every inner node the component-wise maximum of its children. A
+    rectangle that exceeds the bounds of a node can't be placed into any of
+    the bins below it, so first-fit can skip whole groups of bins with a
+    single comparison.
+    """
+
+    def __init__(self, rot=True):
+        """
+        Arguments:
+            rot (bool): Rectangle rotation enabled or disabled
+        """
+        self._rot = rot
+        self._size = 1  # Number of leaves, always a power of two
+        self._len = 0  # Number of slots in use
+        self._width = [0] * 2
+        self._height = [0] * 2
+        self._area = [0] * 2
+
+    def __len__(self):
+        return self._len
+
+    def _grow(self):
+        """
+        Double the number of leaves and rebuild the inner nodes.
+        """
+        old_size = self._size
+        self._size *= 2
+
+        for attr in ('_width', '_height', '_area'):
+            old = getattr(self, attr)
+            new = [0] * (2 * self._size)
+            new[self._size:self._size + old_size] = old[old_size:]
+            for node in range(self._size - 1, 0, -1):
+                new[node] = max(new[2 * node], new[2 * node + 1])
+            setattr(self, attr, new)
+
+    def _admits(self, node, width, height):
+        """
+        Test whether a rectangle of width x height dimensions is within the
+        bounds stored in node.
+        """
+        if width * height > self._area[node]:
+            return False
+
+        max_w, max_h = self._width[node], self._height[node]
+        if width <= max_w and height <= max_h:
+            return True
+
+        return self._rot and height <= max_w and width <= max_h
+
+    def append(self, bounds):
+        """
+        Add a new slot at the end of the tree.
+
+        Arguments:
+            bounds (tuple): Capacity bounds (width, height, area)
+
+        Returns:
+            int: Slot index
+        """
+        if self._len == self._size:
+            self._grow()
+
+        slot = self._len
+        self._len += 1
+        self.update(slot, bounds)
+        return slot
+
+    def update(self, slot, bounds):
+        """
+        Replace slot capacity bounds, and propagate the change to the root.
+
+        Arguments:
+            slot (int): Slot index
+            bounds (tuple): Capacity bounds (width, height, area)
+        """
+        node = slot + self._size
+        self._width[node], self._height[node], self._area[node] = bounds
+
+        node //= 2
+        while node:
+            left, right = 2 * node, 2 * node + 1
+            self._width[node] = max(self._width[left], self._width[right])
+            self._height[node] = max(self._height[left], self._height[right])
+            self._area[node] = max(self._area[left], self._area[right])
+            node //= 2
+
+    def pop(self):
+        """
+        Remove the last slot.
+        """
+        self._len -= 1
+        self.clear(self._len)
+
+    def clear(self, slot):
+        """
+        Mark slot as unable to hold any rectangle.
+        """
+        self.update(slot, (0, 0, 0))
+
+    def find(self, width, height, start=0):
+        """
+        Find the first slot, starting at start, whose bounds could hold a
+        rectangle of width x height dimensions. The bounds are only upper
+        bounds, so the rectangle may still not fit in the bin.
+
+        Arguments:
+            width (int, float): Rectangle width
+            height (int, float): Rectangle height
+            start (int): First slot to consider
+
+        Returns:
+            int: Slot index
+            None: No slot could hold the rectangle
+        """
+        if start >= self._len:
+            return None
+
+        return self._find(1, 0, self._size, width, height, start)
+
+    def _find(self, node, lo, hi, width, height, start):
+        if hi <= start or not self._admits(node, width, height):
+            return None
+
+        if node >= self._size:
+            return lo
+
+        mid = (lo + hi) // 2
+        slot = self._find(2 * node, lo, mid, width, height, start)
+        if slot is None:
+            slot = self._find(2 * node + 1, mid, hi, width, height, start)
+        return slot
@@ -26,7 +26,7 @@ class Rectangle(object):
     width -
     height -
     """
-    __slots__ = ('width', 'height', 'x', 'y', 'rid')
+    __slots__ = ('width', 'height', 'x', 'y', 'rid', 'rotated')
 
     def __init__(self, x, y, width, height, rid=None):
         """
@@ -44,6 +44,7 @@ class Rectangle(object):
         self.x = x
         self.y = y
         self.rid = rid
+        self.rotated = False  # Placed with width and height swapped
 
     @property
     def bottom(self):
@@ -105,6 +105,19 @@ class Guillotine(PackingAlgorithm):
             self._add_section(Rectangle(section.x + width, section.y,
                                         section.width - width, section.height))
 
+    def _update_bounds(self):
+        """
+        Recalculate capacity bounds, any rectangle placed must fit inside one
+        of the free sections.
+        """
+        max_width = max_height = max_area = 0
+        for s in self._sections:
+            max_width = max(max_width, s.width)
+            max_height = max(max_height, s.height)
+            max_area = max(max_area, s.width * s.height)
+
+        self._bounds = (max_width, max_height, max_area)
+
     def _split(self, section, width, height):
         """
         Selects the best split for a section, given a rectangle of dimmensions
@@ -172,9 +185,11 @@ class Guillotine(PackingAlgorithm):
             None: If the rectangle couldn be placed.
         """
         assert (width > 0 and height > 0)
+        if self._exceeds_bounds(width, height):
+            return None
 
         # Obtain the best section to place the rectangle.
-        section, rotated = self._select_fittest_section(width, height)
+        section, rotated = self._memoized(self._select_fittest_section, width, height)
         if not section:
             return None
 
@@ -182,14 +197,53 @@ class Guillotine(PackingAlgorithm):
             width, height = height, width
 
         # Remove section, split and store results
-        self._sections.remove(section)
+        self._sections = [s for s in self._sections if s is not section]
         self._split(section, width, height)
+        self._update_bounds()
+        self._version += 1
 
         # Store rectangle in the selected position
         rect = Rectangle(section.x, section.y, width, height, rid)
+        rect.rotated = rotated and width != height
         self.rectangles.append(rect)
         return rect
 
+    def add_copies(self, width, height, rids):
+        """
+        Add one rectangle of width x height dimensions for each rid, copies
+        are tiled inside the section selected for the first one, and the
+        section is split once for the whole tile block.
+        """
+        assert (width > 0 and height > 0)
+        placed = []
+
+        while len(placed) < len(rids):
+            if self._exceeds_bounds(width, height):
+                break
+
+            section, rotated = self._memoized(self._select_fittest_section, width, height)
+            if not section:
+                break
+
+            w, h = (height, width) if rotated else (width, height)
+            block, tiles = self._tile(section.x, section.y, w, h,
+                                      section.width, section.height,
+                                      len(rids) - len(placed))
+
+            # Remove section, split and store results
+            self._sections = [s for s in self._sections if s is not section]
+            self._split(section, block.width, block.height)
+            self._update_bounds()
+            self._version += 1
+
+            for tile, rid in zip(tiles, rids[len(placed):]):
+                tile.rid = rid
+                tile.rotated = tile.width != width
+            self.rectangles.extend(tiles)
+            placed.extend(tiles)
+
+        return placed
+
     def fitness(self, width, height):
         """
         In guillotine algorithm case, returns the min of the fitness of all
@@ -197,9 +251,11 @@ class Guillotine(PackingAlgorithm):
         (if rotation enabled.)
         """
         assert (width > 0 and height > 0)
+        if self._exceeds_bounds(width, height):
+            return None
 
         # Get best fitness section.
-        section, rotated = self._select_fittest_section(width, height)
+        section, rotated = self._memoized(self._select_fittest_section, width, height)
         if not section:
             return None
 
@@ -210,10 +266,48 @@ class Guillotine(PackingAlgorithm):
         else:
             return self._section_fitness(section, width, height)
 
+    def snapshot(self):
+        return super(Guillotine, self).snapshot(), self._sections
+
+    def restore(self, snapshot):
+        snapshot, self._sections = snapshot
+        super(Guillotine, self).restore(snapshot)
+
+    def _rebuild(self):
+        """
+        The cuts used to place the rectangles aren't known, so the free space
+        is split into vertical strips between consecutive rectangle edges,
+        and the sections are merged back together when possible.
+        """
+        self._sections = []
+        edges = {0, self.width}
+        for r in self.rectangles:
+            edges.update((r.left, r.right))
+        edges = sorted(edges)
+
+        for left, right in zip(edges, edges[1:]):
+            strip = sorted((r for r in self.rectangles if r.left <= left and r.right >= right),
+                           key=operator.attrgetter('bottom'))
+            bottom = 0
+            for r in strip:
+                if r.bottom > bottom:
+                    self._add_section(Rectangle(left, bottom, right - left, r.bottom - bottom))
+                bottom = max(bottom, r.top)
+
+            if bottom < self.height:
+                self._add_section(Rectangle(left, bottom, right - left, self.height - bottom))
+
+        self._update_bounds()
+
+    def close(self):
+        super(Guillotine, self).close()
+        self._sections = []
+
     def reset(self):
         super(Guillotine, self).reset()
         self._sections = []
         self._add_section(Rectangle(0, 0, self.width, self.height))
+        self._update_bounds()
 
 
 class GuillotineBaf(Guillotine):
@@ -126,28 +126,43 @@ class MaxRects(PackingAlgorithm):
         # Remove from max_rects
         self._max_rects = [m for m in self._max_rects if m not in contained]
 
-    # def fitness(self, width, height):
-    #     """
-    #     Metric used to rate how much space is wasted if a rectangle is placed.
-    #     Returns a value greater or equal to zero, the smaller the value the more
-    #     'fit' is the rectangle. If the rectangle can't be placed, returns None.
-    #
-    #     Arguments:
-    #         width (int, float): Rectangle width
-    #         height (int, float): Rectangle height
-    #
-    #     Returns:
-    #         int, float: Rectangle fitness
-    #         None: Rectangle can't be placed
-    #     """
-    #     assert (width > 0 and height > 0)
-    #
-    #     rect, max_rect = self._select_position(width, height)
-    #     if rect is None:
-    #         return None
-    #
-    #     # Return fitness
-    #     return self._rect_fitness(max_rect, rect.width, rect.height)
+    def _update_bounds(self):
+        """
+        Recalculate capacity bounds, any rectangle placed must fit inside one
+        of the maximal rectangles.
+        """
+        max_width = max_height = max_area = 0
+        for m in self._max_rects:
+            max_width = max(max_width, m.width)
+            max_height = max(max_height, m.height)
+            max_area = max(max_area, m.width * m.height)
+
+        self._bounds = (max_width, max_height, max_area)
+
+    def fitness(self, width, height):
+        """
+        Metric used to rate how much space is wasted if a rectangle is placed.
+        Returns a value greater or equal to zero, the smaller the value the more
+        'fit' is the rectangle. If the rectangle can't be placed, returns None.
+
+        Arguments:
+            width (int, float): Rectangle width
+            height (int, float): Rectangle height
+
+        Returns:
+            int, float: Rectangle fitness
+            None: Rectangle can't be placed
+        """
+        assert (width > 0 and height > 0)
+        if self._exceeds_bounds(width, height):
+            return None
+
+        rect, max_rect = self._memoized(self._select_position, width, height)
+        if rect is None:
+            return None
+
+        # Return fitness
+        return self._rect_fitness(max_rect, rect.width, rect.height)
 
     def add_rect(self, width, height, rid=None):
         """
@@ -163,9 +178,11 @@ class MaxRects(PackingAlgorithm):
             None: If the rectangle couldn't be placed.
         """
         assert (width > 0 and height > 0)
+        if self._exceeds_bounds(width, height):
+            return None
 
         # Search best position and orientation
-        rect, _ = self._select_position(width, height)
+        rect, _ = self._memoized(self._select_position, width, height)
         if not rect:
             return None
 
@@ -175,15 +192,83 @@ class MaxRects(PackingAlgorithm):
 
         # Remove any max_rect contained by another
         self._remove_duplicates()
+        self._update_bounds()
+        self._version += 1
 
         # Store and return rectangle position.
         rect.rid = rid
+        rect.rotated = rect.width != width
         self.rectangles.append(rect)
         return rect
 
+    def add_copies(self, width, height, rids):
+        """
+        Add one rectangle of width x height dimensions for each rid, copies
+        are tiled inside the maximal rectangle selected for the first one,
+        and the max_rects are split once for the whole tile block.
+        """
+        assert (width > 0 and height > 0)
+        placed = []
+
+        while len(placed) < len(rids):
+            if self._exceeds_bounds(width, height):
+                break
+
+            rect, max_rect = self._memoized(self._select_position, width, height)
+            if not rect:
+                break
+
+            block, tiles = self._tile(rect.x, rect.y, rect.width, rect.height,
+                                      max_rect.width, max_rect.height,
+                                      len(rids) - len(placed))
+            self._split(block)
+            self._remove_duplicates()
+            self._update_bounds()
+            self._version += 1
+
+            for tile, rid in zip(tiles, rids[len(placed):]):
+                tile.rid = rid
+                tile.rotated = tile.width != width
+            self.rectangles.extend(tiles)
+            placed.extend(tiles)
+
+        return placed
+
+    def snapshot(self):
+        return super(MaxRects, self).snapshot(), self._max_rects
+
+    def restore(self, snapshot):
+        snapshot, self._max_rects = snapshot
+        super(MaxRects, self).restore(snapshot)
+
+    def _rebuild(self):
+        max_rects = [Rectangle(0, 0, self.width, self.height)]
+        for rect in self.rectangles:
+            kept, splits = [], []
+            for m in max_rects:
+                if m.intersects(rect):
+                    splits.extend(self._generate_splits(m, rect))
+                else:
+                    kept.append(m)
+
+            # Maximal rectangles not split are still maximal, only the new
+            # ones can be contained by another one.
+            splits = list(dict.fromkeys(splits))
+            max_rects = kept + [s for s in splits
+                                if not any(m.contains(s) for m in kept)
+                                and not any(o is not s and o.contains(s) for o in splits)]
+
+        self._max_rects = max_rects
+        self._update_bounds()
+
+    def close(self):
+        super(MaxRects, self).close()
+        self._max_rects = []
+
     def reset(self):
         super(MaxRects, self).reset()
         self._max_rects = [Rectangle(0, 0, self.width, self.height)]
+        self._update_bounds()
 
 
 class MaxRectsBl(MaxRects):
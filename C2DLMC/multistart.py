@@ -0,0 +1,123 @@
+import os
+import concurrent.futures
+import numpy as np
+from .maxrects import MaxRectsBaf
+from .packer import newPacker, SORT_AREA, SORT_PERI, SORT_LSIDE, SORT_NONE
+from .bounds import lower_bound as cost_lower_bound
+
+# Item orders the starts are drawn from
+START_ORDERS = (SORT_AREA, SORT_PERI, SORT_LSIDE)
+
+
+def _start_order(widths, heights, start, noise, seed):
+    """
+    Item order of a start. The first starts use each order in START_ORDERS
+    as is, the next ones a random order among them with each key multiplied
+    by a random factor in [1 - noise, 1 + noise], drawn from seed and the
+    start number only.
+    """
+    if start < len(START_ORDERS):
+        return np.argsort(START_ORDERS[start].key(widths, heights), kind='stable')
+
+    rng = np.random.default_rng([seed, start])
+    sort_algo = START_ORDERS[rng.integers(len(START_ORDERS))]
+    keys = sort_algo.key(widths, heights) * rng.uniform(1 - noise, 1 + noise, len(widths))
+    return np.argsort(keys, kind='stable')
+
+
+def pack_start(items, trucks, rids, bids, start, pack_algo=MaxRectsBaf, bin_algo="BFF",
+               rotation=True, noise=0.1, seed=0):
+    """
+    Pack every item in the order of a start, see multi_start() for the
+    arguments.
+
+    Returns:
+        Packer: Packer after pack(), possibly with unplaced items
+    """
+    items = np.asarray(items).reshape(-1, 2)
+    trucks = np.asarray(trucks).reshape(-1, 3)
+    order = _start_order(items[:, 0], items[:, 1], start, noise, seed)
+
+    packer = newPacker(bin_algo=bin_algo, pack_algo=pack_algo, sort_algo=SORT_NONE,
+                       rotation=rotation, cost_aware=True)
+    packer.add_rects(items[order, 0], items[order, 1], np.asarray(rids)[order])
+    packer.add_bins(trucks[:, 0], trucks[:, 1], trucks[:, 2], bids=bids)
+    packer.pack()
+    return packer
+
+
+def _run_start(task):
+    items, trucks, rids, bids, start, pack_algo, bin_algo, rotation, noise, seed = task
+    return pack_start(items, trucks, rids, bids, start, pack_algo, bin_algo, rotation,
+                      noise, seed).result()
+
+
+def multi_start(items, trucks, rids=None, bids=None, starts=32, pack_algo=MaxRectsBaf,
+                bin_algo="BFF", rotation=True, noise=0.1, seed=0, processes=None):
+    """
+    GRASP style multi-start packing, every start packs all the items in a
+    different order (see _start_order), the cheapest packing placing every
+    item is kept. Starts are run in a process pool and stop as soon as one
+    reaches the lower bound (see bounds.lower_bound()).
+
+    Starts are evaluated in order, so the result only depends on the
+    arguments: the cheapest packing among the starts up to the first one
+    reaching the bound, the earliest one on ties.
+
+    Arguments:
+        items (array_like): N x 2 item widths and heights
+        trucks (array_like): K x 3 truck widths, heights and costs
+        rids (array_like): Item ids, their index if None
+        bids (array_like): Truck ids, their index if None
+        starts (int): Number of starts
+        pack_algo (PackingAlgorithm): Algorithm used
+        bin_algo (str): Bin selection heuristic
+        rotation (bool): Items can be rotated
+        noise (float): Relative noise added to the sort keys
+        seed (int): Random seed
+        processes (int): Worker processes, the number of CPUs if None. With
+            1 or less the starts are run in the calling process.
+
+    Returns:
+        tuple (result, best_start, lower_bound, starts_run):
+            result (PackingResult): Cheapest packing, None if no start
+                placed every item
+            best_start (int): Start of the cheapest packing, pack_start()
+                packs it again.
+            lower_bound (int, float): Lower bound on the cost
+            starts_run (int): Number of starts evaluated
+    """
+    items = np.asarray(items).reshape(-1, 2)
+    trucks = np.asarray(trucks).reshape(-1, 3)
+    rids = np.arange(len(items)) if rids is None else np.asarray(rids)
+    bids = list(range(len(trucks))) if bids is None else list(bids)
+
+    lower_bound = cost_lower_bound(items, trucks, rotation)
+    tasks = [(items, trucks, rids, bids, start, pack_algo, bin_algo, rotation, noise, seed)
+             for start in range(starts)]
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    # Results are read in start order, map() is lazy so serial starts
+    # stop being run as soon as the bound is reached.
+    pool = None
+    if processes <= 1 or starts <= 1:
+        results = map(_run_start, tasks)
+    else:
+        pool = concurrent.futures.ProcessPoolExecutor(processes)
+        futures = [pool.submit(_run_start, task) for task in tasks]
+        results = (future.result() for future in futures)
+
+    best, best_start, starts_run = None, None, 0
+    for start, result in enumerate(results):
+        starts_run += 1
+        if len(result) == len(items) and (best is None or result.total_cost < best.total_cost):
+            best, best_start = result, start
+        if best is not None and best.total_cost <= lower_bound:
+            break
+
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+    return best, best_start, lower_bound, starts_run
@@ -0,0 +1,279 @@
+import os
+import time
+import pickle
+import collections
+from .maxrects import MaxRectsBssf, MaxRectsBaf, MaxRectsBl
+from .skyline import SkylineBl
+from .guillotine import GuillotineBafMaxas
+
+# Engines tried before the exact search
+ORACLE_ALGOS = (MaxRectsBssf, MaxRectsBaf, MaxRectsBl, SkylineBl, GuillotineBafMaxas)
+
+
+class _Timeout(Exception):
+    pass
+
+
+class FeasibilityOracle(object):
+    """
+    Answer whether a multiset of items fits in a single width x height
+    truck, and how. Queries go through increasingly expensive steps:
+        - Area and item size screens, they only prove infeasibility.
+        - An LRU memo keyed by the sorted item sizes and the truck size.
+        - The packing engines, they only prove feasibility.
+        - A time limited exact search, see _search().
+
+    Queries the exact search couldn't settle are memoized with its time
+    limit, and only searched again by an oracle with a longer one. The memo
+    can be persisted to a file, so repeated queries across runs are nearly
+    free.
+    """
+
+    def __init__(self, rotation=True, time_limit=0.5, cache_size=100000, path=None,
+                 pack_algos=ORACLE_ALGOS):
+        """
+        Arguments:
+            rotation (bool): Items can be rotated
+            time_limit (float): Time limit of the exact search in seconds
+            cache_size (int): Maximum number of memoized queries
+            path (str): Optional file the memo is loaded from, if it exists,
+                and saved to by save().
+            pack_algos (sequence): Engines tried before the exact search
+        """
+        self._rotation = rotation
+        self._time_limit = time_limit
+        self._cache_size = cache_size
+        self._path = path
+        self._pack_algos = pack_algos
+
+        # key: (feasible, layout of the key items), or (None, time limit)
+        # when the search ran out of time
+        self._cache = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        if path is not None and os.path.exists(path):
+            with open(path, 'rb') as f:
+                rotation, cache = pickle.load(f)
+            if rotation == self._rotation:
+                self._cache.update(cache)
+
+    def __len__(self):
+        return len(self._cache)
+
+    def _canonical(self, width, height):
+        if self._rotation and width < height:
+            return height, width
+        return width, height
+
+    def _key(self, items, width, height):
+        """
+        Canonical form of a query. Items are sorted largest first, with
+        their long side first when they can be rotated, and so is the truck
+        since rotating the whole layout doesn't change anything.
+
+        Returns:
+            tuple (key, order): Memo key, and the index in items of each
+                item in the key.
+        """
+        sizes = [self._canonical(w, h) for w, h in items]
+        order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][0] * sizes[i][1], sizes[i]))
+        return (tuple(sizes[i] for i in order), self._canonical(width, height)), order
+
+    def _orientations(self, width, height):
+        if self._rotation and width != height:
+            return ((width, height), (height, width))
+        return ((width, height),)
+
+    def _screen(self, items, width, height):
+        """
+        Returns:
+            bool: False if some item or the total area doesn't fit, True
+                otherwise.
+        """
+        if sum(w * h for w, h in items) > width * height:
+            return False
+        return all(any(ow <= width and oh <= height for ow, oh in self._orientations(w, h))
+                   for w, h in items)
+
+    def _pack(self, items, width, height):
+        """
+        Try the packing engines.
+
+        Returns:
+            list: (x, y, width, height) of each item, None if no engine
+                placed all of them.
+        """
+        for pack_algo in self._pack_algos:
+            abin = pack_algo(width, height, rot=self._rotation)
+            rects = [abin.add_rect(w, h, i) for i, (w, h) in enumerate(items)]
+            if all(r is not None for r in rects):
+                return [(r.x, r.y, r.width, r.height) for r in rects]
+
+        return None
+
+    def _search(self, items, width, height, end_time):
+        """
+        Exact search over placements of items at the corner points of the
+        envelope of the items already placed, that is the staircase of the
+        highest item top at each x. Every packing can be built this way in
+        some order, so branching on the type of the next item, its
+        orientation and corner point is complete. A branch is cut when the
+        remaining area exceeds the free area above the envelope, and
+        (envelope, remaining items) states that failed are not explored
+        again.
+
+        Returns:
+            list: (x, y, width, height) of each item, None if they don't fit
+
+        Raises:
+            _Timeout: end_time was reached
+        """
+        types = sorted(set(items), key=lambda s: (-s[0] * s[1], s))
+        counts = [items.count(t) for t in types]
+        surface = width * height
+        placed = []  # (type, x, y, width, height)
+        failed = set()
+        nodes = 0
+
+        def dfs(envelope, envelope_area, remaining):
+            # envelope: ((right, top), ...) with right increasing and top
+            # decreasing, the envelope height at x is the top of the first
+            # step whose right is past x.
+            nonlocal nodes
+            if remaining == 0:
+                return True
+
+            nodes += 1
+            if nodes % 256 == 0 and time.perf_counter() > end_time:
+                raise _Timeout()
+
+            if remaining > surface - envelope_area:
+                return False
+
+            state = (envelope, tuple(counts))
+            if state in failed:
+                return False
+
+            corners = [(0, envelope[0][1] if envelope else 0)]
+            corners.extend((envelope[k][0], envelope[k + 1][1] if k + 1 < len(envelope) else 0)
+                           for k in range(len(envelope)))
+
+            for t, (w, h) in enumerate(types):
+                if counts[t] == 0:
+                    continue
+                for ow, oh in self._orientations(w, h):
+                    for x, y in corners:
+                        if x + ow > width or y + oh > height:
+                            continue
+
+                        right, top = x + ow, y + oh
+                        steps = [s for s in envelope if s[0] > right or s[1] > top]
+                        if not any(s[0] >= right and s[1] >= top for s in steps):
+                            steps.append((right, top))
+                            steps.sort()
+                            steps = [s for i, s in enumerate(steps)
+                                     if not any(o[0] >= s[0] and o[1] >= s[1] for o in steps[i + 1:])]
+
+                        area, left = 0, 0
+                        for r, tp in steps:
+                            area += (r - left) * tp
+                            left = r
+
+                        counts[t] -= 1
+                        placed.append((t, x, y, ow, oh))
+                        if dfs(tuple(steps), area, remaining - w * h):
+                            return True
+                        counts[t] += 1
+                        placed.pop()
+
+            failed.add(state)
+            return False
+
+        if not dfs((), 0, sum(w * h for w, h in items)):
+            return None
+
+        # Give each placement to the next item of its type
+        next_item = collections.defaultdict(list)
+        for i, size in reversed(list(enumerate(items))):
+            next_item[size].append(i)
+
+        layout = [None] * len(items)
+        for t, x, y, w, h in placed:
+            layout[next_item[types[t]].pop()] = (x, y, w, h)
+        return layout
+
+    def _remember(self, key, value):
+        self._cache[key] = value
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def layout(self, items, width, height):
+        """
+        Find how items fit in a width x height truck.
+
+        Arguments:
+            items (sequence): (width, height) of each item
+            width, height (int, float): Truck dimensions
+
+        Returns:
+            list: (x, y, width, height) of each item in the truck, in the
+                order of items, width and height are swapped for the
+                rotated ones.
+            False: The items don't fit
+            None: Unknown, the exact search ran out of time
+        """
+        if not items:
+            return []
+
+        key, order = self._key(items, width, height)
+        key_items, (key_width, key_height) = key
+
+        feasible, key_layout = self._cache.get(key, (None, -1))
+        if feasible is not None or key_layout >= self._time_limit:
+            self._cache.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+            key_layout = None
+            if self._screen(key_items, key_width, key_height):
+                key_layout = self._pack(key_items, key_width, key_height)
+                if key_layout is None:
+                    try:
+                        key_layout = self._search(list(key_items), key_width, key_height,
+                                                  time.perf_counter() + self._time_limit)
+                    except _Timeout:
+                        self._remember(key, (None, self._time_limit))
+                        return None
+
+            feasible = key_layout is not None
+            self._remember(key, (feasible, key_layout))
+
+        if not feasible:
+            return None if feasible is None else False
+
+        # Back from the canonical truck and item orientation
+        truck_rotated = (key_width, key_height) != (width, height)
+        layout = [None] * len(items)
+        for k, (x, y, w, h) in enumerate(key_layout):
+            if truck_rotated:
+                x, y, w, h = y, x, h, w
+            layout[order[k]] = (x, y, w, h)
+        return layout
+
+    def fits(self, items, width, height):
+        """
+        Returns:
+            bool: True if the items fit in a width x height truck, False
+                if they don't.
+            None: Unknown, the exact search ran out of time
+        """
+        layout = self.layout(items, width, height)
+        return None if layout is None else layout is not False
+
+    def save(self, path=None):
+        """
+        Write the memo to path, or to the path given when created.
+        """
+        with open(path or self._path, 'wb') as f:
+            pickle.dump((self._rotation, self._cache), f)
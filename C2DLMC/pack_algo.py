@@ -1,10 +1,11 @@
 from .geometry import Rectangle
+from .validate import find_outside, find_collision
 
 
 class PackingAlgorithm(object):
     """PackingAlgorithm base class"""
 
-    def __init__(self, width, height, rot=True, bid=None, *args, **kwargs):
+    def __init__(self, width, height, rot=True, bid=None, cost=None, *args, **kwargs):
         """
         Initialize packing algorithm
 
@@ -13,18 +14,32 @@ class PackingAlgorithm(object):
             height (int, float): Packing surface height
             rot (bool): Rectangle rotation enabled or disabled
             bid (string|int|...): Packing surface identification
+            cost (int, float): Cost of using the surface
         """
         self.width = width
         self.height = height
         self.rot = rot
         self.rectangles = []
         self.bid = bid
+        self.cost = cost
         self._surface = Rectangle(0, 0, width, height)
+
+        # Mutation counter, and memo of position searches valid while the
+        # counter doesn't change.
+        self._version = 0
+        self._memo = {}
+        self._memo_version = 0
         self.reset()
 
     def __len__(self):
         return len(self.rectangles)
 
+    def __getstate__(self):
+        # The position search memo is left out, it's rebuilt as needed
+        state = self.__dict__.copy()
+        state['_memo'] = {}
+        return state
+
     def __iter__(self):
         return iter(self.rectangles)
 
@@ -54,15 +69,15 @@ class PackingAlgorithm(object):
         """
         return self.rectangles[key]
 
-    # def used_area(self):
-    #     """
-    #     Total area of rectangles placed
-    #
-    #     Returns:
-    #         int, float: Area
-    #     """
-    #     return sum(r.area() for r in self)
-    #
+    def used_area(self):
+        """
+        Total area of rectangles placed
+
+        Returns:
+            int, float: Area
+        """
+        return sum(r.area() for r in self)
+
     def fitness(self, width, height, rot=False):
         """
         Metric used to rate how much space is wasted if a rectangle is placed.
@@ -80,6 +95,64 @@ class PackingAlgorithm(object):
         """
         raise NotImplementedError
 
+    def capacity_bounds(self):
+        """
+        Upper bounds on the free space left in the surface, no rectangle
+        wider, taller or with a larger area than these values can be placed.
+        Bounds are kept up to date by each algorithm as rectangles are placed,
+        so the call is O(1).
+
+        Returns:
+            tuple (width, height, area): Capacity bounds
+        """
+        return self._bounds
+
+    def _memoized(self, select, width, height):
+        """
+        Call select(width, height) remembering the result until the surface
+        is modified, so repeated searches for the same rectangle size (same
+        position, failed placement, or fitness probe) are a dict lookup.
+
+        Arguments:
+            select (callable): Position search method
+            width (int, float): Rectangle width
+            height (int, float): Rectangle height
+
+        Returns:
+            Whatever select returns
+        """
+        if self._memo_version != self._version:
+            self._memo = {}
+            self._memo_version = self._version
+
+        key = (width, height)
+        try:
+            return self._memo[key]
+        except KeyError:
+            result = self._memo[key] = select(width, height)
+            return result
+
+    def _exceeds_bounds(self, width, height):
+        """
+        Test if a rectangle surely can't be placed because it exceeds the
+        capacity bounds in any orientation.
+
+        Arguments:
+            width (int, float): Rectangle width
+            height (int, float): Rectangle height
+
+        Returns:
+            boolean: True if it can't be placed, False if it might be
+        """
+        max_width, max_height, max_area = self._bounds
+        if width * height > max_area:
+            return True
+
+        if width <= max_width and height <= max_height:
+            return False
+
+        return not (self.rot and height <= max_width and width <= max_height)
+
     def add_rect(self, width, height, rid=None):
         """
         Add rectangle of width x height dimensions.
@@ -95,6 +168,50 @@ class PackingAlgorithm(object):
         """
         raise NotImplementedError
 
+    def add_copies(self, width, height, rids):
+        """
+        Add one rectangle of width x height dimensions for each rid, the
+        algorithms place as many copies as possible next to each other,
+        inside the free region where the first one was placed, before
+        searching for a new position.
+
+        Arguments:
+            width (int, float): Rectangle width
+            height (int, float): Rectangle height
+            rids (sequence): Rectangle user id of each copy
+
+        Returns:
+            list: Rectangles placed, shorter than rids if not all copies
+                could be placed.
+        """
+        placed = []
+        for rid in rids:
+            rect = self.add_rect(width, height, rid=rid)
+            if rect is None:
+                break
+            placed.append(rect)
+
+        return placed
+
+    def _tile(self, x, y, width, height, max_width, max_height, count):
+        """
+        Arrange up to count rectangles of width x height dimensions in a grid
+        with its lower left corner at (x, y), inside a free region of
+        max_width x max_height. The grid is always full, at least one
+        rectangle is placed.
+
+        Returns:
+            tuple (block, tiles):
+                block (Rectangle): Rectangle covering the whole grid
+                tiles (list): Rectangles in the grid, row by row
+        """
+        columns = max(1, min(count, int(max_width // width)))
+        rows = max(1, min(int(max_height // height), count // columns))
+
+        tiles = [Rectangle(x + c * width, y + r * height, width, height)
+                 for r in range(rows) for c in range(columns)]
+        return Rectangle(x, y, columns * width, rows * height), tiles
+
     def rect_list(self):
         """
         Returns a list with all rectangles placed into the surface.
@@ -113,20 +230,84 @@ class PackingAlgorithm(object):
         Check for collisions between rectangles, also check all are placed
         inside surface.
         """
-        surface = Rectangle(0, 0, self.width, self.height)
+        rects = [(r.x, r.y, r.width, r.height) for r in self]
 
-        for r in self:
-            if not surface.contains(r):
-                raise Exception("Rectangle placed outside surface")
+        if find_outside(self.width, self.height, rects) is not None:
+            raise Exception("Rectangle placed outside surface")
+
+        if find_collision(rects) is not None:
+            raise Exception("Rectangle collision detected")
+
+    def close(self):
+        """
+        Release the structures used to track free space, after closing no
+        more rectangles can be placed but those already placed are kept.
+        """
+        self._bounds = (0, 0, 0)
+        self._version += 1
+
+    def snapshot(self):
+        """
+        Capture the current state in O(1). Free space structures are never
+        modified in place, only replaced, so holding a reference to them is
+        enough, and rectangles are only appended so their count is stored.
 
-        rectangles = [r for r in self]
-        if len(rectangles) <= 1:
-            return
+        Returns:
+            tuple: Opaque snapshot to be used with restore()
+        """
+        return self.rectangles, len(self.rectangles), self._bounds
 
-        for r1 in range(0, len(rectangles) - 2):
-            for r2 in range(r1 + 1, len(rectangles) - 1):
-                if rectangles[r1].intersects(rectangles[r2]):
-                    raise Exception("Rectangle collision detected")
+    def restore(self, snapshot):
+        """
+        Return to the state captured by snapshot(), the cost is proportional
+        to the rectangles placed since. Snapshots taken after the restored
+        one become invalid.
+
+        Arguments:
+            snapshot (tuple): Value returned by snapshot()
+        """
+        rectangles, count, self._bounds = snapshot
+        del rectangles[count:]
+        self.rectangles = rectangles
+        self._version += 1
+
+    def remove_rects(self, rects):
+        """
+        Remove placed rectangles and rebuild the free space structures, so
+        the area they covered can be used again. The cost depends on the
+        number of rectangles left in the surface, not on the whole packing.
+
+        Arguments:
+            rects (iterable): Rectangles returned by add_rect() or add_copies()
+
+        Returns:
+            int: Number of rectangles removed
+        """
+        removed = set(map(id, rects))
+
+        # A new list is created because snapshots may reference the old one
+        rectangles = [r for r in self.rectangles if id(r) not in removed]
+        count = len(self.rectangles) - len(rectangles)
+
+        self.rectangles = rectangles
+        self._rebuild()
+        self._version += 1
+        return count
+
+    def reopen(self):
+        """
+        Rebuild the free space structures released by close(), so more
+        rectangles can be placed.
+        """
+        self._rebuild()
+        self._version += 1
+
+    def _rebuild(self):
+        """
+        Recalculate free space structures and capacity bounds from the
+        rectangles placed, algorithms tracking free space override it.
+        """
+        self._bounds = (self.width, self.height, self.width * self.height)
 
     def is_empty(self):
         # Returns true if there is no rectangles placed.
@@ -134,3 +315,7 @@ class PackingAlgorithm(object):
 
     def reset(self):
         self.rectangles = []  # List of placed Rectangles.
+        self._version += 1
+        # Capacity bounds (width, height, area), subclasses tighten them
+        # as the surface is filled.
+        self._bounds = (self.width, self.height, self.width * self.height)
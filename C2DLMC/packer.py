@@ -1,12 +1,120 @@
 from .maxrects import MaxRectsBssf
+from .shelf import ShelfNf
+from .capacity import CapacityTree
+from .result import PackingResult
 import itertools
 import collections
+import heapq
+import bisect
+import time
+import numpy as np
+
+class SortAlgo(object):
+    """
+    Rectangle sort order. Instances are called with a list of (width,
+    height, ...) tuples and return them sorted, the packer instead evaluates
+    key() over the width and height columns with a single argsort.
+
+    The sort algos below are module level instances pickled by name, so
+    they are the same objects after unpickling, in another process too.
+    """
+    name = None
+
+    def key(self, widths, heights):
+        """
+        Arguments:
+            widths (numpy.ndarray): Rectangle widths
+            heights (numpy.ndarray): Rectangle heights
+
+        Returns:
+            numpy.ndarray: Keys whose ascending stable argsort is the order
+        """
+        raise NotImplementedError
+
+    def __call__(self, rectlist):
+        rects = list(rectlist)
+        if not rects:
+            return rects
+
+        widths = np.array([r[0] for r in rects])
+        heights = np.array([r[1] for r in rects])
+        order = np.argsort(self.key(widths, heights), kind='stable').tolist()
+        return [rects[i] for i in order]
+
+    def __reduce__(self):
+        return self.name
+
+    def __repr__(self):
+        return self.name
+
+
+class SortArea(SortAlgo):
+    """Sort by area, largest first"""
+    name = 'SORT_AREA'
+
+    def key(self, widths, heights):
+        return -(widths * heights)
+
+
+class SortPeri(SortAlgo):
+    """Sort by perimeter, largest first"""
+    name = 'SORT_PERI'
+
+    def key(self, widths, heights):
+        return -(widths + heights)
+
+
+class SortLside(SortAlgo):
+    """Sort by longest side, largest first"""
+    name = 'SORT_LSIDE'
+
+    def key(self, widths, heights):
+        return -np.maximum(widths, heights)
+
+
+class SortNone(SortAlgo):
+    """Unsorted"""
+    name = 'SORT_NONE'
+
+    def key(self, widths, heights):
+        return np.zeros(len(widths))
+
+    def __call__(self, rectlist):
+        return list(rectlist)
+
 
 # Sorting algos for rectangle lists
-SORT_AREA = lambda rectlist: sorted(rectlist, reverse=True,
-                                    key=lambda r: r[0] * r[1])  # Sort by area
+SORT_AREA = SortArea()
+SORT_PERI = SortPeri()
+SORT_LSIDE = SortLside()
+SORT_NONE = SortNone()
+
 
-SORT_NONE = lambda rectlist: list(rectlist)  # Unsorted
+# Fraction of the pack() time budget kept for the fallback placement
+_DEADLINE_RESERVE = 0.1
+
+
+class PackingMode(object):
+    """
+    Packer modes
+        Online: Rectangles are packed as soon are they are added
+        Offline: Rectangles aren't packed untils pack() is called
+    """
+    Online = 0
+    Offline = 1
+
+
+def _copy_rids(rid, count):
+    """
+    Tuple with the rid of each one of count rectangle copies, rid is either
+    shared by all of them or a sequence of count rids.
+    """
+    if isinstance(rid, (list, tuple, np.ndarray)):
+        if len(rid) != count:
+            raise ValueError("One rid per rectangle copy expected")
+        return tuple(rid)
+
+    return (rid,) * count
 
 
 class BinFactory(object):
@@ -24,29 +132,37 @@ class BinFactory(object):
 
         self._bid = kwargs.get("bid", None)
 
-    def _create_bin(self):
-        return self._pack_algo(self._width, self._height, *self._algo_args, **self._algo_kwargs)
+    def __getstate__(self):
+        # The reference bin is created again when needed
+        state = self.__dict__.copy()
+        state['_ref_bin'] = None
+        return state
+
+    def _create_bin(self, pack_algo=None):
+        pack_algo = pack_algo or self._pack_algo
+        return pack_algo(self._width, self._height, *self._algo_args,
+                         cost=self._cost, **self._algo_kwargs)
 
     def is_empty(self):
         return self._count < 1
 
     def fitness(self, width, height):
-        if not self._ref_bin:
+        if self._ref_bin is None:
             self._ref_bin = self._create_bin()
 
         return self._ref_bin.fitness(width, height)
 
     def fits_inside(self, width, height):
         # Determine if rectangle widthxheight will fit into empty bin
-        if not self._ref_bin:
+        if self._ref_bin is None:
             self._ref_bin = self._create_bin()
 
         return self._ref_bin._fits_surface(width, height)
 
-    def new_bin(self):
+    def new_bin(self, pack_algo=None):
         if self._count > 0:
             self._count -= 1
-            return self._create_bin()
+            return self._create_bin(pack_algo)
         else:
             return None
 
@@ -60,29 +176,324 @@ class BinFactory(object):
         return f"Bin: {self._width}x{self._height}, Count: {self._count}, Cost: {self._cost}, ID: {self._bid}"
 
 
+class BinQueue(object):
+    """
+    Bin factories ranked by cost effectiveness for the item area still to be
+    packed. A bin of area A holds at most min(A, R) of the remaining item
+    area R, so it's ranked by min(A, R) / cost:
+        - Bins with A <= R are ranked by A / cost, kept in a heap.
+        - Bins with A > R are all ranked R / cost, so the cheapest is the
+          best, kept in a heap by cost.
+
+    R changes while packing and repairing, and a bin can end up in the wrong
+    heap. Its rank there is still an upper bound of its actual rank, so it's
+    only moved to the other heap when it reaches the top. Changing R is O(1),
+    moving a bin and selecting one are O(log K).
+
+    The queue is kept across snapshot restores, the packer adds the factories
+    created afterwards and the ones an undo made available again.
+    """
+
+    def __init__(self, factories, remaining_area):
+        """
+        Arguments:
+            factories (dict): Bin factories by key, factories removed from it
+                or without bins left are skipped.
+            remaining_area (int, float): Item area still to be packed
+        """
+        self._factories = factories
+        self.remaining_area = remaining_area
+
+        self._area = {k: f._width * f._height for k, f in factories.items()}
+        self._cost = {k: f._cost for k, f in factories.items()}
+
+        self._small = [self._small_entry(k) for k in factories if self._area[k] <= remaining_area]
+        self._large = [self._large_entry(k) for k in factories if self._area[k] > remaining_area]
+        heapq.heapify(self._small)
+        heapq.heapify(self._large)
+
+    def _ratio(self, key, area):
+        cost = self._cost[key]
+        return area / cost if cost > 0 else float('inf')
+
+    def _small_entry(self, key):
+        return -self._ratio(key, self._area[key]), key
+
+    def _large_entry(self, key):
+        # Cheapest first, then largest
+        return self._cost[key], -self._area[key], key
+
+    def update(self, remaining_area):
+        """
+        Change the item area still to be packed.
+        """
+        self.remaining_area = remaining_area
+
+    def add(self, key):
+        """
+        Rank a factory added after the queue was built, or that had been
+        depleted and got bins back. Factories already ranked are ignored.
+        """
+        if key in self._area:
+            return
+
+        factory = self._factories[key]
+        self._area[key] = factory._width * factory._height
+        self._cost[key] = factory._cost
+        if self._area[key] <= self.remaining_area:
+            heapq.heappush(self._small, self._small_entry(key))
+        else:
+            heapq.heappush(self._large, self._large_entry(key))
+
+    def _top(self, heap):
+        """
+        Discard heap entries whose factory is gone, move the ones in the
+        wrong heap to the other one, and return the first valid one.
+        """
+        while heap:
+            key = heap[0][-1]
+            binfac = self._factories.get(key)
+            if binfac is None or binfac.is_empty():
+                heapq.heappop(heap)
+                del self._area[key]
+                del self._cost[key]
+            elif heap is self._small and self._area[key] > self.remaining_area:
+                heapq.heappush(self._large, self._large_entry(key))
+                heapq.heappop(heap)
+            elif heap is self._large and self._area[key] <= self.remaining_area:
+                heapq.heappush(self._small, self._small_entry(key))
+                heapq.heappop(heap)
+            else:
+                return heap[0]
+
+        return None
+
+    def select(self, width, height, fits=None):
+        """
+        Return the key of the best ranked factory whose bins can hold a
+        rectangle of width x height dimensions.
+
+        Arguments:
+            fits (sequence): Optional row of a fits matrix indexed by
+                factory key, used instead of the bin size check for the
+                factories it covers.
+
+        Returns:
+            Factory key, or None if no bin can hold the rectangle
+        """
+        skipped = []
+        key = None
+
+        while True:
+            # The large bins heap may move bins to the small one, which
+            # only gets valid entries from it, so its top is taken again.
+            self._top(self._small)
+            large = self._top(self._large)
+            small = self._top(self._small)
+            if small is None and large is None:
+                break
+
+            small_ratio = -small[0] if small else -1
+            large_ratio = -1
+            if large:
+                large_ratio = self._ratio(large[-1], self.remaining_area)
+
+            heap = self._small if small_ratio >= large_ratio else self._large
+            top = heap[0][-1]
+            if fits is not None and top < len(fits):
+                fit = fits[top]
+            else:
+                fit = self._factories[top].fits_inside(width, height)
+            if fit:
+                key = top
+                break
+
+            # Too small for the rectangle, but maybe not for the next ones
+            skipped.append((heap, heapq.heappop(heap)))
+
+        for heap, entry in skipped:
+            heapq.heappush(heap, entry)
+
+        return key
+
+
+class BinList(object):
+    """
+    Sequence of bins with O(1) append, removal of any bin and undo of the
+    removal. A removed bin is replaced by the last one, so the order changes
+    when a bin other than the last is removed.
+    """
+
+    def __init__(self):
+        self._bins = []
+        self._position = {}
+
+    def __iter__(self):
+        return iter(self._bins)
+
+    def __len__(self):
+        return len(self._bins)
+
+    def __getitem__(self, key):
+        return self._bins[key]
+
+    def append(self, abin):
+        self._position[abin] = len(self._bins)
+        self._bins.append(abin)
+
+    def pop(self):
+        """
+        Remove and return the last bin.
+        """
+        abin = self._bins.pop()
+        del self._position[abin]
+        return abin
+
+    def remove(self, abin):
+        """
+        Remove a bin, the last bin takes its position.
+
+        Returns:
+            int: Position of the bin, to undo the removal with insert()
+        """
+        position = self._position.pop(abin)
+        last = self._bins.pop()
+        if last is not abin:
+            self._bins[position] = last
+            self._position[last] = position
+        return position
+
+    def insert(self, position, abin):
+        """
+        Undo remove(), the bin at position goes back to the end.
+        """
+        if position < len(self._bins):
+            self.append(self._bins[position])
+            self._bins[position] = abin
+            self._position[abin] = position
+        else:
+            self.append(abin)
+
+
 class PackerBFFMixin(object):
     """
     BFF (Bin First Fit): Pack rectangle in first bin it fits
     """
 
     def add_rect(self, width, height, rid=None):
-        # see if this rect will fit in any of the open bins
-        for b in self._open_bins:
-            rect = b.add_rect(width, height, rid=rid)
-            if rect is not None:
-                return rect
+        rects = self.add_copies(width, height, (rid,))
+        return rects[0] if rects else None
 
-        while True:
+    def add_copies(self, width, height, rids):
+        """
+        Pack one width x height rectangle for each rid, when a bin accepts a
+        copy it places as many of the following copies as it can before
+        moving to the next bin.
+
+        Returns:
+            list: Rectangles placed, shorter than rids when not all fit
+        """
+        placed = []
+
+        # see if the copies fit in any of the open bins, the capacity
+        # tree skips the bins that certainly can't hold them.
+        slot = self._capacity.find(width, height)
+        while slot is not None:
+            placed.extend(self._place(self._slot_bins[slot], width, height,
+                                      rids[len(placed):]))
+            if len(placed) == len(rids):
+                return placed
+            slot = self._capacity.find(width, height, slot + 1)
+
+        while len(placed) < len(rids):
+            # can we find an unopened bin that will hold this rect?
+            new_bin = self._new_open_bin(width, height, rid=rids[len(placed)])
+            if new_bin is None:
+                break
+
+            # _new_open_bin may return a bin that's too small,
+            # so _place may not place anything.
+            placed.extend(self._place(new_bin, width, height, rids[len(placed):]))
+
+        return placed
+
+
+class PackerBBFMixin(object):
+    """
+    BBF (Bin Best Fit): Pack rectangle in the bin that gives the best fitness.
+
+    The fitness of every open bin for the current rectangle size is kept in a
+    heap, entries are only recalculated for bins that changed, so consecutive
+    rectangles with the same size don't re-score every open bin.
+    """
+
+    def _fitness_key(self, fitness):
+        return fitness
+
+    def _push_fitness(self, abin):
+        fitness = abin.fitness(*self._fit_size)
+        if fitness is not None:
+            slot = self._bin_slot[abin]
+            heapq.heappush(self._fit_heap,
+                           (self._fitness_key(fitness), slot, self._slot_version[slot]))
+
+    def _place_fittest(self, abin, width, height, rids):
+        rects = self._place(abin, width, height, rids)
+        if rects and abin in self._bin_slot:
+            self._push_fitness(abin)
+        return rects
+
+    def add_rect(self, width, height, rid=None):
+        rects = self.add_copies(width, height, (rid,))
+        return rects[0] if rects else None
+
+    def add_copies(self, width, height, rids):
+        """
+        Pack one width x height rectangle for each rid, when a bin accepts a
+        copy it places as many of the following copies as it can before
+        moving to the next bin.
+
+        Returns:
+            list: Rectangles placed, shorter than rids when not all fit
+        """
+        placed = []
+
+        # Rebuild the fitness heap when the rectangle size changes
+        if self._fit_size != (width, height):
+            self._fit_size = (width, height)
+            self._fit_heap = []
+            for b in self._open_bins:
+                self._push_fitness(b)
+
+        while self._fit_heap and len(placed) < len(rids):
+            _, slot, version = heapq.heappop(self._fit_heap)
+            b = self._slot_bins[slot]
+            if b is None or version != self._slot_version[slot]:
+                continue  # Stale entry, the bin was closed or has changed
+
+            placed.extend(self._place_fittest(b, width, height, rids[len(placed):]))
+
+        while len(placed) < len(rids):
             # can we find an unopened bin that will hold this rect?
-            new_bin = self._new_open_bin(width, height, rid=rid)
+            new_bin = self._new_open_bin(width, height, rid=rids[len(placed)])
             if new_bin is None:
-                return None
+                break
 
             # _new_open_bin may return a bin that's too small,
-            # so we have to double-check
-            rect = new_bin.add_rect(width, height, rid=rid)
-            if rect is not None:
-                return rect
+            # so _place may not place anything.
+            placed.extend(self._place_fittest(new_bin, width, height, rids[len(placed):]))
+
+        return placed
+
+
+class PackerBWFMixin(PackerBBFMixin):
+    """
+    BWF (Bin Worst Fit): Pack rectangle in the bin that gives the worst
+    fitness.
+    """
+
+    def _fitness_key(self, fitness):
+        return -fitness
 
 
 class PackerMaster(object):
@@ -90,14 +501,22 @@ class PackerMaster(object):
     Rectangles are packed as soon are they are added
     """
 
-    def __init__(self, pack_algo=MaxRectsBssf, rotation=True):
+    def __init__(self, pack_algo=MaxRectsBssf, rotation=True, max_open_bins=None,
+                 cost_aware=False):
         """
         Arguments:
             pack_algo (PackingAlgorithm): What packing algo to use
             rotation (bool): Enable/Disable rectangle rotation
+            max_open_bins (int): Optional limit of simultaneously open bins,
+                when reached the least promising bin is closed.
+            cost_aware (bool): When the item area still to be packed is
+                known, open the bin with the best cost for it (see BinQueue)
+                instead of the first bin added.
         """
         self._rotation = rotation
         self._pack_algo = pack_algo
+        self._max_open_bins = max_open_bins
+        self._cost_aware = cost_aware
         self.reset()
 
     def __iter__(self):
@@ -106,6 +525,13 @@ class PackerMaster(object):
     def __len__(self):
         return len(self._closed_bins) + len(self._open_bins)
 
+    @property
+    def open_bin_count(self):
+        """
+        Number of bins still open for new rectangles
+        """
+        return len(self._open_bins)
+
     def __getitem__(self, key):
         """
         Return bin in selected position. (excluding empty bins)
@@ -126,53 +552,490 @@ class PackerMaster(object):
         else:
             return self._open_bins[key - len(self._closed_bins)]
 
-    def _new_open_bin(self, width=None, height=None, rid=None):
+    def _select_bin_factory(self, width, height):
+        """
+        Return the key of the factory used for the next bin, or None if no
+        bin left can hold a width x height rectangle.
+        """
+        if self._cost_aware and self._remaining_area is not None:
+            if self._bin_queue is None:
+                self._bin_queue = BinQueue(self._empty_bins, self._remaining_area)
+            else:
+                self._bin_queue.update(self._remaining_area)
+            return self._bin_queue.select(width, height, self._fits_row)
+
+        fits = self._fits_row
+        for key in self._empty_keys:
+            binfac = self._empty_bins[key]
+            if binfac.is_empty():
+                continue
+            # Only return the new bin if the rect fits.
+            # (If width or height is None, caller doesn't know the size.)
+            if fits is not None and key < len(fits):
+                if fits[key]:
+                    return key
+            elif binfac.fits_inside(width, height):
+                return key
+
+        return None
+
+    def _new_open_bin(self, width=None, height=None, rid=None, pack_algo=None):
         """
         Extract the next empty bin and append it to open bins
 
+        Arguments:
+            pack_algo (PackingAlgorithm): Algorithm used by the new bin
+                instead of the packer one.
+
         Returns:
             PackingAlgorithm: Initialized empty packing bin.
             None: No bin big enough for the rectangle was found
         """
-        factories_to_delete = set()  #
-        new_bin = None
-
-        for key, binfac in self._empty_bins.items():
+        key = self._select_bin_factory(width, height)
+        if key is None:
+            return None
 
-            # Only return the new bin if the rect fits.
-            # (If width or height is None, caller doesn't know the size.)
-            if not binfac.fits_inside(width, height):
-                continue
+        # Create bin and add to open_bins
+        binfac = self._empty_bins[key]
+        new_bin = binfac.new_bin(pack_algo or self._new_bin_algo)
 
-            # Create bin and add to open_bins
-            new_bin = binfac.new_bin()
-            if new_bin is None:
-                continue
-            self._open_bins.append(new_bin)
+        if self._max_open_bins and len(self._open_bins) >= self._max_open_bins:
+            self._close_bin(min(self._open_bins,
+                                key=lambda b: (b.capacity_bounds()[2], self._bin_slot[b])))
 
-            # If the factory was depleted mark for deletion
-            if binfac.is_empty():
-                factories_to_delete.add(key)
+        self._open_bins.append(new_bin)
+        self._bin_slot[new_bin] = len(self._slot_bins)
+        self._slot_bins.append(new_bin)
+        self._slot_version.append(0)
+        self._capacity.append(new_bin.capacity_bounds())
 
-            break
+        if self._journal is not None:
+            self._journal.append((self._undo_open, key, binfac, binfac.is_empty()))
 
-        # Delete marked factories
-        for f in factories_to_delete:
-            del self._empty_bins[f]
+        # Delete the factory once depleted
+        if binfac.is_empty():
+            self._remove_factory(key)
 
         return new_bin
 
+    def _is_saturated(self, abin):
+        """
+        Test if a bin can't hold any of the rectangles still to be packed,
+        because its free space is smaller than the smallest of them.
+        """
+        if self._min_item is None:
+            return False
+
+        min_side, min_area = self._min_item
+        max_width, max_height, max_area = abin.capacity_bounds()
+        return max_area < min_area or max(max_width, max_height) < min_side
+
+    def _close_bin(self, abin):
+        """
+        Move an open bin to closed bins, releasing its free space structures.
+        """
+        if self._journal is not None:
+            state = abin.snapshot()
+
+        slot = self._bin_slot.pop(abin)
+        self._slot_bins[slot] = None
+        self._slot_version[slot] += 1
+        self._capacity.clear(slot)
+
+        position = self._open_bins.remove(abin)
+        self._closed_bins.append(abin)
+        abin.close()
+
+        if self._journal is not None:
+            self._journal.append((self._undo_close, abin, slot, position, state))
+
+    def _close_saturated(self):
+        """
+        Close every open bin that can't hold any remaining rectangle.
+        """
+        for abin in [b for b in self._open_bins if self._is_saturated(b)]:
+            self._close_bin(abin)
+
+    def _bin_changed(self, abin):
+        """
+        Refresh the capacity bounds of an open bin after a rectangle was
+        placed in it, and close it if it became saturated.
+        """
+        if self._is_saturated(abin):
+            self._close_bin(abin)
+        else:
+            self._refresh_slot(self._bin_slot[abin])
+
+    def _place(self, abin, width, height, rids):
+        """
+        Place copies of a width x height rectangle into an open bin, and
+        refresh its capacity bounds.
+
+        Returns:
+            list: Rectangles placed
+        """
+        if self._journal is None:
+            rects = abin.add_copies(width, height, rids)
+        else:
+            state = abin.snapshot()
+            rects = abin.add_copies(width, height, rids)
+            if rects:
+                self._journal.append((self._undo_place, abin, state))
+
+        if rects:
+            # The bin cost counts once the bin holds a rectangle
+            if len(abin) == len(rects):
+                self._cost += abin.cost
+            if self._rid_index is not None:
+                for rect in rects:
+                    self._rid_index[rect.rid].append((abin, rect))
+            self._bin_changed(abin)
+        return rects
+
+    def __getstate__(self):
+        """
+        State for pickling, without what is rebuilt on demand: the rid
+        index, the bin queue and the best fit heap. The undo journal is left
+        out too, snapshots taken before pickling can't be restored on the
+        copy.
+        """
+        state = self.__dict__.copy()
+        state.update(_rid_index=None, _bin_queue=None, _fit_heap=[], _fit_size=None,
+                     _journal=None)
+        return state
+
     def add_bin(self, width, height, cost, count=1, **kwargs):
         # accept the same parameters as PackingAlgorithm objects
+        self._add_factory(width, height, cost, count, **kwargs)
+
+    def _add_factory(self, width, height, cost, count=1, **kwargs):
+        """
+        Make count new empty bins available, recorded in the journal. Offline
+        packers override add_bin() to store the bins until pack() is called,
+        this adds them to the current packing in both modes.
+        """
         kwargs['rot'] = self._rotation
         bin_factory = BinFactory(width, height, cost, count, self._pack_algo, **kwargs)
-        self._empty_bins[next(self._bin_count)] = bin_factory
+        key = self._bin_count
+        self._bin_count += 1
+        self._empty_bins[key] = bin_factory
+        self._empty_keys.append(key)  # Keys are increasing
+        if self._bin_queue is not None:
+            self._bin_queue.add(key)
+
+        if self._journal is not None:
+            self._journal.append((self._undo_add_bin, key))
+
+    def snapshot(self):
+        """
+        Capture the packer state in O(1). From the first snapshot on until
+        commit(), every change is recorded in a journal together with the
+        O(1) snapshot of the bin it modifies, so restore() only undoes the
+        changes made since.
+
+        Returns:
+            tuple: Opaque snapshot to be used with restore()
+        """
+        if self._journal is None:
+            self._journal = []
+        return self._journal, len(self._journal), self._min_item
+
+    def restore(self, snapshot):
+        """
+        Return to the state captured by snapshot(). Snapshots taken after the
+        restored one become invalid.
+
+        Arguments:
+            snapshot (tuple): Value returned by snapshot()
+        """
+        journal, mark, min_item = snapshot
+        if journal is not self._journal:
+            raise ValueError("Snapshot was taken before the packer was reset or committed")
+
+        while len(journal) > mark:
+            undo, *args = journal.pop()
+            undo(*args)
+
+        self._min_item = min_item
+        self._fit_size = None  # Force fitness heap rebuild
+        self._rid_index = None
+
+    def commit(self):
+        """
+        Keep the current state and drop the journal, so it doesn't grow
+        with every change kept. The snapshots taken so far become invalid,
+        and changes aren't recorded again until the next snapshot().
+        """
+        self._journal = None
+
+    def _refresh_slot(self, slot):
+        """
+        Mark the bin in slot as changed, and update its capacity bounds.
+        """
+        abin = self._slot_bins[slot]
+        self._slot_version[slot] += 1
+        self._capacity.update(slot, abin.capacity_bounds())
+
+    def _undo_place(self, abin, state):
+        filled = bool(abin)
+        abin.restore(state)
+        if filled != bool(abin):
+            self._cost += -abin.cost if filled else abin.cost
+        self._refresh_slot(self._bin_slot[abin])
+
+    def _undo_open(self, key, binfac, deleted):
+        abin = self._open_bins.pop()
+        del self._bin_slot[abin]
+        self._slot_bins.pop()
+        self._slot_version.pop()
+        self._capacity.pop()
+
+        binfac._count += 1
+        if deleted:
+            # Reinsert the factory keeping the order the bins were added in
+            self._empty_bins[key] = binfac
+            bisect.insort(self._empty_keys, key)
+            if self._bin_queue is not None:
+                self._bin_queue.add(key)
+
+    def _undo_close(self, abin, slot, position, state):
+        self._closed_bins.pop()
+        abin.restore(state)
+
+        self._open_bins.insert(position, abin)
+        self._slot_bins[slot] = abin
+        self._bin_slot[abin] = slot
+        self._refresh_slot(slot)
+
+    def _undo_add_bin(self, key):
+        self._remove_factory(key)
+
+    def _remove_factory(self, key):
+        del self._empty_bins[key]
+        del self._empty_keys[bisect.bisect_left(self._empty_keys, key)]
+
+    def _undo_reopen(self, abin, position, state):
+        self._open_bins.pop()
+        del self._bin_slot[abin]
+        self._slot_bins.pop()
+        self._slot_version.pop()
+        self._capacity.pop()
+
+        abin.restore(state)
+        self._closed_bins.insert(position, abin)
+
+    def _undo_drop(self, abin, slot, position):
+        if abin:
+            self._cost += abin.cost
+        if slot is None:
+            self._closed_bins.insert(position, abin)
+        else:
+            self._open_bins.insert(position, abin)
+            self._slot_bins[slot] = abin
+            self._bin_slot[abin] = slot
+            self._refresh_slot(slot)
+
+    def _rect_index(self):
+        """
+        Placed rectangles indexed by rid as lists of (bin, rectangle), built
+        on first use and kept up to date while rectangles are placed or
+        removed.
+        """
+        if self._rid_index is None:
+            self._rid_index = collections.defaultdict(list)
+            for abin in self:
+                for rect in abin:
+                    self._rid_index[rect.rid].append((abin, rect))
+
+        return self._rid_index
+
+    def _reopen_bin(self, abin):
+        """
+        Move a closed bin back to open bins rebuilding its free space
+        structures, it's given a new slot after every other open bin.
+        """
+        if self._max_open_bins and len(self._open_bins) >= self._max_open_bins:
+            self._close_bin(min(self._open_bins,
+                                key=lambda b: (b.capacity_bounds()[2], self._bin_slot[b])))
+
+        position = self._closed_bins.remove(abin)
+        if self._journal is not None:
+            self._journal.append((self._undo_reopen, abin, position, abin.snapshot()))
+        abin.reopen()
+
+        self._open_bins.append(abin)
+        self._bin_slot[abin] = len(self._slot_bins)
+        self._slot_bins.append(abin)
+        self._slot_version.append(0)
+        self._capacity.append(abin.capacity_bounds())
+
+    def _drop_bin(self, abin):
+        """
+        Remove a bin from the packing, its rectangles are left untouched.
+        """
+        slot = self._bin_slot.pop(abin, None)
+        if slot is None:
+            position = self._closed_bins.remove(abin)
+        else:
+            self._slot_bins[slot] = None
+            self._slot_version[slot] += 1
+            self._capacity.clear(slot)
+            position = self._open_bins.remove(abin)
+
+        if abin:
+            self._cost -= abin.cost
+        if self._journal is not None:
+            self._journal.append((self._undo_drop, abin, slot, position))
+
+    def remove_rects(self, rids):
+        """
+        Remove the placed rectangles with any of the given rids, including
+        every copy sharing one of them. The area they covered is freed in
+        their bins, closed bins are reopened so it can be reused, and only
+        those bins are rebuilt.
+
+        Arguments:
+            rids (iterable): Rectangle ids
+
+        Returns:
+            int: Number of rectangles removed
+        """
+        index = self._rect_index()
+
+        bin_rects = {}
+        for rid in set(rids):
+            for abin, rect in index.pop(rid, ()):
+                bin_rects.setdefault(abin, []).append(rect)
+
+        self._min_item = None
+        for abin, rects in bin_rects.items():
+            if abin not in self._bin_slot:
+                self._reopen_bin(abin)
+
+            if self._journal is not None:
+                self._journal.append((self._undo_place, abin, abin.snapshot()))
+            abin.remove_rects(rects)
+            if not abin:
+                self._cost -= abin.cost
+            self._refresh_slot(self._bin_slot[abin])
+
+        return sum(len(rects) for rects in bin_rects.values())
+
+    def remove_bins(self, bins, release=False):
+        """
+        Take bins out of the packing together with their rectangles.
+
+        Arguments:
+            bins (iterable): Bins in the packing, as returned when iterating
+                or indexing the packer.
+            release (bool): Make each bin available again as a new empty
+                bin, otherwise it isn't used again.
+
+        Returns:
+            list: (width, height, rid) of the rectangles removed, with their
+                original orientation.
+        """
+        rects = []
+        for abin in bins:
+            self._drop_bin(abin)
+
+            if self._rid_index is not None:
+                for rid in {rect.rid for rect in abin}:
+                    entries = [e for e in self._rid_index[rid] if e[0] is not abin]
+                    if entries:
+                        self._rid_index[rid] = entries
+                    else:
+                        del self._rid_index[rid]
+
+            rects.extend((r.height, r.width, r.rid) if r.rotated else (r.width, r.height, r.rid)
+                         for r in abin)
+
+            if release:
+                self._add_factory(abin.width, abin.height, abin.cost, bid=abin.bid)
+
+        return rects
+
+    def insert_rects(self, rects, pack_algo=None):
+        """
+        Place new rectangles into the current packing in the given order,
+        using the open bins first and new bins when they don't fit.
+
+        Arguments:
+            rects (iterable): (width, height, rid) of each rectangle,
+                consecutive rectangles of the same size are placed together.
+            pack_algo (PackingAlgorithm): Algorithm used by the new bins
+                opened for them instead of the packer one.
+
+        Returns:
+            list: (width, height, rid) of the rectangles that couldn't be
+                placed.
+        """
+        rects = list(rects)
+
+        # Bins were closed for the rectangles packed, not for the new ones
+        self._min_item = None
+        self._remaining_area = sum(r[0] * r[1] for r in rects)
+        self._new_bin_algo = pack_algo
+
+        unplaced = []
+        for (width, height), group in itertools.groupby(rects, key=lambda r: r[:2]):
+            rids = [r[2] for r in group]
+            placed = self.add_copies(width, height, rids)
+            unplaced.extend((width, height, rid) for rid in rids[len(placed):])
+            self._remaining_area -= width * height * len(rids)
+
+        self._new_bin_algo = None
+        return unplaced
+
+    def insert_rect(self, width, height, rid=None, count=1):
+        """
+        Place count new width x height rectangles into the current packing,
+        using the open bins first and new bins when they don't fit.
+
+        Arguments:
+            width (int, float): Rectangle width
+            height (int, float): Rectangle height
+            rid: Optional rectangle id shared by all copies, or a sequence
+                with the id of each copy.
+            count (int): Number of copies
+
+        Returns:
+            list: Rectangles placed, shorter than count when not all fit
+        """
+        # Bins were closed for the rectangles packed, not for the new ones
+        self._min_item = None
+        self._remaining_area = width * height * count
+        return self.add_copies(width, height, _copy_rids(rid, count))
+
+    def evacuate_bin(self, abin):
+        """
+        Take a bin out of the packing and repack only its rectangles, largest
+        first, into the remaining open bins and new ones. The bin isn't used
+        again.
+
+        Arguments:
+            abin (PackingAlgorithm): Bin in the packing, as returned when
+                iterating or indexing the packer.
+
+        Returns:
+            list: (width, height, rid) of the rectangles that couldn't be
+                placed again.
+        """
+        # Copies of the same size are grouped to be placed together
+        rects = sorted(self.remove_bins([abin]), key=lambda r: (-r[0] * r[1], r[0], r[1]))
+        return self.insert_rects(rects)
 
     def rect_list(self):
+        """
+        Return a list of the rectangles placed, with the index of their bin
+        in bin_list()
+        """
         rectangles = []
         bin_count = 0
 
         for abin in self:
+            if not abin:
+                continue
             for rect in abin:
                 rectangles.append((bin_count, rect.x, rect.y, rect.width, rect.height, rect.rid))
             bin_count += 1
@@ -186,20 +1049,112 @@ class PackerMaster(object):
         """
         return [(b.width, b.height, b.bid) for b in self if b]
 
+    def empty_bin_list(self):
+        """
+        Return a list with the bins not used yet, grouped as they were added
+        with the format (width, height, cost, count, bid)
+        """
+        return [(f._width, f._height, f._cost, f._count, f._bid)
+                for f in map(self._empty_bins.__getitem__, self._empty_keys) if not f.is_empty()]
+
+    def total_cost(self):
+        """
+        Return the cost of the bins holding rectangles in O(1), the cost of
+        result(). Open bins left empty aren't counted.
+        """
+        return self._cost
+
+    def result(self):
+        """
+        Return the current packing as a PackingResult
+        """
+        return PackingResult(self, degraded=self._degraded)
+
     def validate_packing(self):
         for b in self:
             b.validate_packing()
 
     def reset(self):
         # Bins fully packed and closed.
-        self._closed_bins = collections.deque()
+        self._closed_bins = BinList()
 
         # Bins ready to pack rectangles
-        self._open_bins = collections.deque()
+        self._open_bins = BinList()
+
+        # Capacity bounds of open bins indexed by slot, slots are assigned
+        # in opening order so first-fit order is preserved.
+        self._capacity = CapacityTree(rot=self._rotation)
+        self._slot_bins = []
+        self._bin_slot = {}
+        self._slot_version = []  # Incremented each time a bin changes
+
+        # Heap of (fitness, slot, version) for the open bins, used by best
+        # and worst fit bin selection. Valid for rectangles of _fit_size.
+        self._fit_heap = []
+        self._fit_size = None
+
+        # Undo journal, only kept once a snapshot has been taken
+        self._journal = None
+
+        # Placed rectangles by rid, only kept once a repair has been made
+        self._rid_index = None
+
+        # Some rectangles were placed with the fallback algorithm
+        self._degraded = False
+
+        # Cost of the bins in the packing
+        self._cost = 0
+
+        # Algorithm for the new bins instead of the packer one, when set
+        self._new_bin_algo = None
+
+        # (side, area) of the smallest rectangle still to be packed if known,
+        # bins that can't hold it are closed.
+        self._min_item = None
+
+        # User provided bins not in current use by key, and their keys in the
+        # order the bins were added, kept when a deletion is undone.
+        self._empty_bins = {}
+        self._empty_keys = []
+        self._bin_count = 0  # Key of the next bin factory
 
-        # User provided bins not in current use
-        self._empty_bins = collections.OrderedDict()  # O(1) deletion of arbitrary elem
-        self._bin_count = itertools.count()
+        # Item area still to be packed if known, and the empty bins ranked
+        # for it when cost aware.
+        self._remaining_area = None
+        self._bin_queue = None
+
+        # Fits matrix row of the rectangle being packed if known, indexed by
+        # factory key.
+        self._fits_row = None
+
+
+class PackerOnline(PackerMaster):
+    """
+    Rectangles are packed as soon are they are added, bins can be added at
+    any time and are used by the rectangles added afterwards.
+    """
+    pass
+
+
+class PackerOnlineBFF(PackerOnline, PackerBFFMixin):
+    """
+    BFF (Bin First Fit): Pack rectangle in first bin it fits
+    """
+    pass
+
+
+class PackerOnlineBBF(PackerOnline, PackerBBFMixin):
+    """
+    BBF (Bin Best Fit): Pack rectangle in bin that gives best fitness
+    """
+    pass
+
+
+class PackerOnlineBWF(PackerOnline, PackerBWFMixin):
+    """
+    BWF (Bin Worst Fit): Pack rectangle in bin that gives worst fitness
+    """
+    pass
 
 
 class Packer(PackerMaster):
@@ -207,48 +1162,273 @@ class Packer(PackerMaster):
     Rectangles aren't packed untils pack() is called
     """
 
-    def __init__(self, pack_algo=MaxRectsBssf, sort_algo=SORT_NONE, rotation=True):
+    def __init__(self, pack_algo=MaxRectsBssf, sort_algo=SORT_NONE, rotation=True,
+                 max_open_bins=None, cost_aware=False, patterns=None):
         """
+        Arguments:
+            patterns (PatternLibrary): Optional library of truck layouts,
+                the rectangles it covers are placed before packing.
         """
-        super(Packer, self).__init__(pack_algo=pack_algo, rotation=rotation)
+        super(Packer, self).__init__(pack_algo=pack_algo, rotation=rotation,
+                                     max_open_bins=max_open_bins, cost_aware=cost_aware)
 
         self._sort_algo = sort_algo
+        self._patterns = patterns
 
-        # User provided bins and Rectangles
+        # User provided bins, and Rectangles stored by columns
         self._avail_bins = collections.deque()
-        self._avail_rect = collections.deque()
+        self._rect_width = []
+        self._rect_height = []
+        self._rect_rid = []  # Single rid, or tuple with one rid per copy
+        self._rect_count = []
 
         # Aux vars used during packing
         self._sorted_rect = []
 
+    def __getstate__(self):
+        state = super(Packer, self).__getstate__()
+        state['_sorted_rect'] = []
+        return state
+
     def add_bin(self, width, height, cost, count=1, **kwargs):
         self._avail_bins.append((width, height, cost, count, kwargs))
 
-    def add_rect(self, width, height, rid=None):
-        self._avail_rect.append((width, height, rid))
+    def add_bins(self, widths, heights, costs, counts=None, bids=None):
+        """
+        Add several bin types at once.
+
+        Arguments:
+            widths (array_like): Bin widths
+            heights (array_like): Bin heights
+            costs (array_like): Bin costs
+            counts (array_like): Number of bins of each type, 1 if omitted
+            bids (array_like): Optional bin ids
+        """
+        widths = np.asarray(widths).tolist()
+        heights = np.asarray(heights).tolist()
+        costs = np.asarray(costs).tolist()
+        counts = [1] * len(widths) if counts is None else np.asarray(counts).tolist()
+
+        if bids is None:
+            kwargs = ({} for _ in widths)
+        else:
+            kwargs = ({'bid': bid} for bid in np.asarray(bids).tolist())
+
+        self._avail_bins.extend(zip(widths, heights, costs, counts, kwargs))
+
+    def avail_bin_list(self):
+        """
+        Return a list with the bins given to pack(), grouped as they were
+        added with the format (width, height, cost, count, bid)
+        """
+        return [(width, height, cost, count, kwargs.get('bid'))
+                for width, height, cost, count, kwargs in self._avail_bins]
+
+    def add_rect(self, width, height, rid=None, count=1):
+        """
+        Add count identical rectangles of width x height dimensions.
+
+        Arguments:
+            width (int, float): Rectangle width
+            height (int, float): Rectangle height
+            rid: Optional rectangle id shared by all copies, or a sequence
+                with the id of each copy.
+            count (int): Number of copies, at least 1
+        """
+        if count < 1:
+            raise ValueError("At least one rectangle copy expected")
+        if count > 1:
+            rid = _copy_rids(rid, count)
+
+        self._rect_width.append(width)
+        self._rect_height.append(height)
+        self._rect_rid.append(rid)
+        self._rect_count.append(count)
+
+    def add_rects(self, widths, heights, rids=None, counts=None):
+        """
+        Add several rectangles at once.
+
+        Arguments:
+            widths (array_like): Rectangle widths
+            heights (array_like): Rectangle heights
+            rids (array_like): Optional rectangle ids
+            counts (array_like): Optional number of copies of each rectangle,
+                at least 1, all copies share its rid.
+        """
+        if counts is not None:
+            counts = np.asarray(counts).tolist()
+            if any(count < 1 for count in counts):
+                raise ValueError("At least one rectangle copy expected")
+
+        widths = np.asarray(widths).tolist()
+        self._rect_width.extend(widths)
+        self._rect_height.extend(np.asarray(heights).tolist())
+
+        if rids is None:
+            rids = [None] * len(widths)
+        else:
+            rids = np.asarray(rids).tolist()
+
+        if counts is None:
+            self._rect_rid.extend(rids)
+            self._rect_count.extend(itertools.repeat(1, len(widths)))
+        else:
+            self._rect_rid.extend(rid if count == 1 else _copy_rids(rid, count)
+                                  for rid, count in zip(rids, counts))
+            self._rect_count.extend(counts)
 
     def _is_everything_ready(self):
-        return self._avail_rect and self._avail_bins
+        return self._rect_width and self._avail_bins
+
+    def _sorted_columns(self, widths, heights, rids, counts):
+        """
+        Sort rectangle columns using the sorting algo, known algos are
+        evaluated with a single argsort over the width and height columns.
 
-    def pack(self):
+        Returns:
+            tuple (widths, heights, rids, counts, order): Rectangles in
+                packing order, widths and heights as numpy arrays, rids and
+                counts as lists, and order the input position of each one.
+        """
+        if not widths or self._sort_algo is SORT_NONE:
+            return (np.asarray(widths), np.asarray(heights), list(rids), list(counts),
+                    list(range(len(widths))))
+
+        if not isinstance(self._sort_algo, SortAlgo):
+            # User provided sorting function, sort rectangle tuples.
+            rects = self._sort_algo(zip(widths, heights, rids, counts, range(len(widths))))
+            widths, heights, rids, counts, order = zip(*rects)
+            return np.asarray(widths), np.asarray(heights), list(rids), list(counts), list(order)
+
+        widths, heights = np.asarray(widths), np.asarray(heights)
+        order = np.argsort(self._sort_algo.key(widths, heights), kind='stable').tolist()
+        return (widths[order], heights[order],
+                [rids[i] for i in order], [counts[i] for i in order], order)
+
+    def _pack_fallback(self, rects):
+        """
+        Place rects next fit into new shelf bins, only the last bin opened
+        is tried, so each rectangle is placed in O(1).
 
+        Arguments:
+            rects (list): (width, height, rid, count) tuples
+        """
+        abin = None
+        for width, height, rid, count in rects:
+            rids = (rid,) if count == 1 else rid
+            while rids:
+                if abin is not None and abin in self._bin_slot:
+                    rids = rids[len(self._place(abin, width, height, rids)):]
+                    if not rids:
+                        break
+                    if abin in self._bin_slot:
+                        self._close_bin(abin)
+
+                abin = self._new_open_bin(width, height, pack_algo=ShelfNf)
+                if abin is None:
+                    break
+
+    def pack(self, deadline=None, cutoff=None, fits=None):
+        """
+        Pack all the rectangles added.
+
+        Arguments:
+            deadline (float): Optional time budget in seconds. When it's
+                nearly used up, the rectangles left are placed into new bins
+                with a fast next fit shelf algorithm, and the result is
+                flagged as degraded.
+            cutoff (callable): Optional function returning a cost, called
+                before each rectangle. Once the bins opened cost as much,
+                packing stops and the result only holds the rectangles
+                packed so far.
+            fits (array_like): Optional N x K boolean matrix telling if each
+                rectangle added fits in each bin added, in the order they
+                were added, used instead of the bin size checks.
+
+        Returns:
+            PackingResult: Packing solution
+        """
+        start_time = time.perf_counter()
         self.reset()
 
         if not self._is_everything_ready():
             # maybe we should throw an error here?
-            return
+            return self.result()
+
+        # Fill bins with the stored layouts first, only the rectangles and
+        # bins left go through the packing algorithm.
+        avail_bins = self._avail_bins
+        columns = (self._rect_width, self._rect_height, self._rect_rid, self._rect_count)
+        bin_rows, rect_rows = range(len(avail_bins)), range(len(self._rect_width))
+        if self._patterns is not None:
+            filled, avail_bins, columns, bin_rows, rect_rows = self._patterns.cover(
+                avail_bins, *columns, pack_algo=self._pack_algo, rotation=self._rotation)
+            for abin in filled:
+                self._closed_bins.append(abin)
+            self._cost += sum(abin.cost for abin in filled)
 
         # Add available bins to packer
-        for b in self._avail_bins:
+        for b in avail_bins:
             width, height, cost, count, extra_kwargs = b
-            super(Packer, self).add_bin(width, height, cost, count, **extra_kwargs)
+            self._add_factory(width, height, cost, count, **extra_kwargs)
 
         # If enabled sort rectangles
-        self._sorted_rect = self._sort_algo(self._avail_rect)
+        widths, heights, rids, counts, order = self._sorted_columns(*columns)
+
+        # Fits matrix rows in packing order, with a column per factory key
+        if fits is not None:
+            fits = np.asarray(fits, dtype=bool)
+            fits = fits[np.ix_(np.asarray(rect_rows, dtype=int)[order], np.asarray(bin_rows, dtype=int))]
+
+        # Smallest side and area among the rectangles from each position to
+        # the end, used to close the bins that can't hold any of them.
+        min_side = np.minimum.accumulate(np.minimum(widths, heights)[::-1])[::-1]
+        min_area = np.minimum.accumulate((widths * heights)[::-1])[::-1]
+
+        # Item area from each position to the end, used to rank the bins
+        if self._cost_aware:
+            areas = widths * heights * np.asarray(counts)
+            remaining_areas = np.cumsum(areas[::-1])[::-1].tolist()
+        else:
+            remaining_areas = itertools.repeat(None)
+
+        widths, heights = widths.tolist(), heights.tolist()
+        self._sorted_rect = list(zip(widths, heights, rids, counts))
+
+        if deadline is not None:
+            fallback_time = start_time + deadline * (1 - _DEADLINE_RESERVE)
+
+        # Start packing, copies of the same rectangle are packed together
+        min_items = zip(min_side.tolist(), min_area.tolist())
+        for i, (r, min_item, remaining_area) in enumerate(zip(self._sorted_rect, min_items,
+                                                              remaining_areas)):
+            self._remaining_area = remaining_area
+            if deadline is not None and time.perf_counter() > fallback_time:
+                self._degraded = True
+                self._fits_row = None
+                self._pack_fallback(self._sorted_rect[i:])
+                break
 
-        # Start packing
-        for r in self._sorted_rect:
-            super(Packer, self).add_rect(*r)
+            if cutoff is not None and self._cost >= cutoff():
+                break
+
+            if min_item != self._min_item:
+                self._min_item = min_item
+                self._close_saturated()
+
+            if fits is not None:
+                self._fits_row = fits[i]
+
+            width, height, rid, count = r
+            if count == 1:
+                super(Packer, self).add_rect(width, height, rid)
+            else:
+                self.add_copies(width, height, rid)
+
+        self._remaining_area = None
+        self._fits_row = None
+        return self.result()
 
 
 class PackerBFF(Packer, PackerBFFMixin):
@@ -258,31 +1438,81 @@ class PackerBFF(Packer, PackerBFFMixin):
     pass
 
 
+class PackerBBF(Packer, PackerBBFMixin):
+    """
+    BBF (Bin Best Fit): Pack rectangle in bin that gives best fitness
+    """
+    pass
+
+
+class PackerBWF(Packer, PackerBWFMixin):
+    """
+    BWF (Bin Worst Fit): Pack rectangle in bin that gives worst fitness
+    """
+    pass
+
+
 def newPacker(bin_algo="BFF",
               pack_algo=MaxRectsBssf,
               sort_algo=SORT_AREA,
-              rotation=True):
+              rotation=True,
+              max_open_bins=None,
+              mode=PackingMode.Offline,
+              cost_aware=False,
+              patterns=None):
     """
     Packer factory helper function
 
     Arguments:
-        mode (PackingMode): Packing mode
-            Online: Rectangles are packed as soon are they are added
-            Offline: Rectangles aren't packed untils pack() is called
         bin_algo (PackingBin): Bin selection heuristic
         pack_algo (PackingAlgorithm): Algorithm used
+        sort_algo: Rectangle sort order before packing (offline mode only)
         rotation (boolean): Enable or disable rectangle rotation.
+        max_open_bins (int): Limit of simultaneously open bins, None for
+            no limit.
+        mode (PackingMode): Packing mode
+            Online: Rectangles are packed as soon are they are added
+            Offline: Rectangles aren't packed untils pack() is called
+        cost_aware (bool): Open the bin with the best cost for the item area
+            still to be packed, instead of the first one added (offline
+            mode only).
+        patterns (PatternLibrary): Library of truck layouts reused before
+            packing (offline mode only).
 
     Returns:
         Packer: Initialized packer instance.
     """
-    if bin_algo == "BFF":
-        packer_class = PackerBFF
+    packer_class = None
+
+    # Online Mode
+    if mode == PackingMode.Online:
+        sort_algo = None
+        if bin_algo == "BFF":
+            packer_class = PackerOnlineBFF
+        elif bin_algo == "BBF":
+            packer_class = PackerOnlineBBF
+        elif bin_algo == "BWF":
+            packer_class = PackerOnlineBWF
+
+    # Offline Mode
+    elif mode == PackingMode.Offline:
+        if bin_algo == "BFF":
+            packer_class = PackerBFF
+        elif bin_algo == "BBF":
+            packer_class = PackerBBF
+        elif bin_algo == "BWF":
+            packer_class = PackerBWF
+
     else:
+        raise AttributeError("Unsupported packing mode")
+
+    if packer_class is None:
         raise AttributeError("Unsupported bin selection heuristic")
 
-    if sort_algo:
-        return packer_class(pack_algo=pack_algo, sort_algo=sort_algo,
-                            rotation=rotation)
+    if mode == PackingMode.Offline:
+        return packer_class(pack_algo=pack_algo, sort_algo=sort_algo or SORT_NONE,
+                            rotation=rotation, max_open_bins=max_open_bins,
+                            cost_aware=cost_aware, patterns=patterns)
     else:
-        return packer_class(pack_algo=pack_algo, rotation=rotation)
+        return packer_class(pack_algo=pack_algo, rotation=rotation,
+                            max_open_bins=max_open_bins, cost_aware=cost_aware)
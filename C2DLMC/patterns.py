@@ -0,0 +1,214 @@
+import os
+import pickle
+import collections
+import numpy as np
+from .geometry import Rectangle
+
+
+class PatternLibrary(object):
+    """
+    Truck layouts kept from previous packings, to be reused when the same
+    item sizes and truck types come back. A pattern is the layout of one
+    truck, keyed by the truck type, that is its size and cost, and the
+    multiset of item sizes it holds, and
+    indexed by item size so the patterns an instance can use are found
+    without scanning the library.
+
+    Before packing, cover() fills trucks with patterns chosen greedily by
+    item area per cost, as long as there are enough items of every size
+    and a truck of the pattern type left. Only the items left are packed
+    by the engines.
+    """
+
+    def __init__(self, rotation=True, min_fill=0.8, path=None):
+        """
+        Arguments:
+            rotation (bool): Items can be rotated
+            min_fill (float): Minimum fraction of the truck area covered by
+                the layouts kept.
+            path (str): Optional file the library is loaded from, if it
+                exists, and saved to by save().
+        """
+        self._rotation = rotation
+        self._min_fill = min_fill
+        self._path = path
+
+        # ((width, height, cost), ((item size, count), ...)): ((item size,
+        # x, y, width, height), ...) with sizes canonical, see _canonical().
+        self._patterns = {}
+
+        # Pattern keys by item size
+        self._by_item = collections.defaultdict(set)
+
+        if path is not None and os.path.exists(path):
+            with open(path, 'rb') as f:
+                rotation, patterns = pickle.load(f)
+            if rotation == self._rotation:
+                for key, layout in patterns.items():
+                    self._insert(key, layout)
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def _canonical(self, width, height):
+        if self._rotation and width < height:
+            return height, width
+        return width, height
+
+    def _insert(self, key, layout):
+        self._patterns[key] = layout
+        for size, _ in key[1]:
+            self._by_item[size].add(key)
+
+    def add(self, width, height, cost, rects):
+        """
+        Keep the layout of a truck, if it's full enough and not known yet.
+
+        Arguments:
+            width, height (int, float): Truck dimensions
+            cost (int, float): Truck cost
+            rects (iterable): (x, y, width, height) of the items placed
+
+        Returns:
+            bool: True if the layout was added
+        """
+        rects = list(rects)
+        if not rects or sum(w * h for _, _, w, h in rects) < self._min_fill * width * height:
+            return False
+
+        # Layouts are stored for the canonical truck orientation
+        truck = self._canonical(width, height)
+        if truck != (width, height):
+            rects = [(y, x, h, w) for x, y, w, h in rects]
+        truck += (cost,)
+
+        layout = tuple(sorted((self._canonical(w, h), x, y, w, h) for x, y, w, h in rects))
+        items = tuple(sorted(collections.Counter(slot[0] for slot in layout).items()))
+
+        key = (truck, items)
+        if key in self._patterns:
+            return False
+
+        self._insert(key, layout)
+        return True
+
+    def add_result(self, result):
+        """
+        Keep the layout of every truck of a packing.
+
+        Arguments:
+            result (PackingResult): Packing solution
+
+        Returns:
+            int: Number of layouts added
+        """
+        order = np.argsort(result.rect_bin, kind='stable')
+        starts = np.searchsorted(result.rect_bin[order], np.arange(len(result.bin_bid) + 1))
+        columns = np.column_stack((result.x, result.y, result.width, result.height))[order].tolist()
+
+        added = 0
+        trucks = zip(result.bin_width.tolist(), result.bin_height.tolist(), result.bin_cost.tolist())
+        for b, (width, height, cost) in enumerate(trucks):
+            added += self.add(width, height, cost, columns[starts[b]:starts[b + 1]])
+
+        return added
+
+    def cover(self, bins, widths, heights, rids, counts, pack_algo, rotation=True):
+        """
+        Fill trucks with stored patterns. Patterns are looked up through the
+        item size index and tried by decreasing item area per cost, each one
+        as many times as items and trucks of its type are left.
+
+        Arguments:
+            bins (iterable): Available bins as (width, height, cost, count,
+                kwargs) tuples
+            widths, heights, rids, counts (sequence): Rectangle columns, a
+                rid is a tuple with one rid per copy when count > 1.
+            pack_algo (PackingAlgorithm): Algorithm of the filled bins
+            rotation (bool): Rectangle rotation enabled, it has to match the
+                library setting.
+
+        Returns:
+            tuple (filled, bins, columns, bin_rows, rect_rows):
+                filled (list): Closed bins holding the covered rectangles
+                bins (list): Available bins left, in the same format
+                columns (tuple): widths, heights, rids and counts lists of
+                    the rectangles left
+                bin_rows (list): Index in the input of each bin left
+                rect_rows (list): Index in the input of each rectangle left
+        """
+        if rotation != self._rotation:
+            raise ValueError("Pattern library built with a different rotation setting")
+
+        bins = list(bins)
+        left = [b[3] for b in bins]
+
+        # Copies of each canonical item size as (row, copy), and bins of
+        # each type.
+        items = collections.defaultdict(list)
+        for row, (width, height, count) in enumerate(zip(widths, heights, counts)):
+            items[self._canonical(width, height)].extend((row, copy) for copy in range(count))
+
+        trucks = collections.defaultdict(list)
+        for k, (width, height, cost, count, _) in enumerate(bins):
+            if count > 0:
+                trucks[self._canonical(width, height) + (cost,)].append(k)
+
+        keys = set()
+        for size in items:
+            keys.update(self._by_item.get(size, ()))
+        candidates = [key for key in keys if key[0] in trucks]
+
+        def value(key):
+            area = sum(size[0] * size[1] * n for size, n in key[1])
+            return area / max(key[0][2], 1e-9)
+        candidates.sort(key=lambda key: (-value(key), key))
+
+        filled, taken = [], set()
+        for key in candidates:
+            truck, pattern_items = key
+            ks = trucks[truck]
+            while ks and all(len(items[size]) >= n for size, n in pattern_items):
+                k = ks[0]
+                width, height, cost, _, kwargs = bins[k]
+                left[k] -= 1
+                if left[k] == 0:
+                    ks.pop(0)
+
+                abin = pack_algo(width, height, rot=rotation, cost=cost, **kwargs)
+                truck_rotated = truck[:2] != (width, height)
+                for size, x, y, w, h in self._patterns[key]:
+                    row, copy = items[size].pop()
+                    taken.add((row, copy))
+                    if truck_rotated:
+                        x, y, w, h = y, x, h, w
+                    rid = rids[row] if counts[row] == 1 else rids[row][copy]
+                    rect = Rectangle(x, y, w, h, rid)
+                    rect.rotated = (w, h) != (widths[row], heights[row])
+                    abin.rectangles.append(rect)
+                abin.close()
+                filled.append(abin)
+
+        # Rows left with their remaining copies
+        columns = ([], [], [], [])
+        rect_rows = []
+        for row, (width, height, rid, count) in enumerate(zip(widths, heights, rids, counts)):
+            remaining = [copy for copy in range(count) if (row, copy) not in taken]
+            if not remaining:
+                continue
+            rect_rows.append(row)
+            if len(remaining) < count:
+                rid = rid[remaining[0]] if len(remaining) == 1 else tuple(rid[c] for c in remaining)
+            for column, entry in zip(columns, (width, height, rid, len(remaining))):
+                column.append(entry)
+
+        bin_rows = [k for k, n in enumerate(left) if n > 0]
+        bins_left = [bins[k][:3] + (left[k],) + bins[k][4:] for k in bin_rows]
+        return filled, bins_left, columns, bin_rows, rect_rows
+
+    def save(self, path=None):
+        """
+        Write the library to path, or to the path given when created.
+        """
+        with open(path or self._path, 'wb') as f:
+            pickle.dump((self._rotation, self._patterns), f)
@@ -0,0 +1,187 @@
+import os
+import math
+import time
+import multiprocessing
+import concurrent.futures
+import numpy as np
+from .guillotine import GuillotineBafMaxas
+from .maxrects import MaxRectsBl, MaxRectsBssf, MaxRectsBaf, MaxRectsBlsf
+from .skyline import SkylineBl
+from .packer import newPacker, SORT_AREA, SORT_PERI, SORT_LSIDE
+from .bounds import lower_bound as cost_lower_bound
+
+# Engines and item orders crossed by the portfolio
+PORTFOLIO_ALGOS = (SkylineBl, MaxRectsBl, MaxRectsBaf, MaxRectsBssf, MaxRectsBlsf, GuillotineBafMaxas)
+PORTFOLIO_SORTS = {'SORT_AREA': SORT_AREA, 'SORT_PERI': SORT_PERI, 'SORT_LSIDE': SORT_LSIDE}
+
+# Cost of the cheapest plan found by any worker, shared between processes
+_incumbent = None
+
+
+def _init_worker(incumbent):
+    global _incumbent
+    _incumbent = incumbent
+
+
+def _cutoff():
+    return _incumbent.value
+
+
+def _pack_member(items, trucks, rids, bids, pack_algo, sort_algo, bin_algo, rotation,
+                 deadline=None, cutoff=None):
+    packer = newPacker(bin_algo=bin_algo, pack_algo=pack_algo, sort_algo=sort_algo,
+                       rotation=rotation, cost_aware=True)
+    packer.add_rects(items[:, 0], items[:, 1], rids)
+    packer.add_bins(trucks[:, 0], trucks[:, 1], trucks[:, 2], bids=bids)
+    return packer.pack(deadline=deadline, cutoff=cutoff)
+
+
+def _run_member(task):
+    """
+    Pack every item with one engine and item order. Packing stops as soon
+    as the trucks opened cost as much as the incumbent, and before the end
+    time with the fallback algorithm.
+
+    Returns:
+        PackingResult: Packing placing every item, None if it was stopped
+            or started after the end time.
+    """
+    items, trucks, rids, bids, pack_algo, sort_algo, bin_algo, rotation, end_time = task
+
+    deadline = None
+    if end_time is not None:
+        deadline = end_time - time.time()
+        if deadline <= 0:
+            return None
+
+    result = _pack_member(items, trucks, rids, bids, pack_algo, sort_algo, bin_algo, rotation,
+                          deadline, _cutoff)
+    if len(result) < len(items):
+        return None
+
+    with _incumbent.get_lock():
+        _incumbent.value = min(_incumbent.value, result.total_cost)
+    return result
+
+
+def _member_cost(task):
+    items, trucks, pack_algo, sort_algo, bin_algo, rotation = task
+    result = _pack_member(items, trucks, np.arange(len(items)), list(range(len(trucks))),
+                          pack_algo, sort_algo, bin_algo, rotation)
+    return result.total_cost if len(result) == len(items) else None
+
+
+def portfolio(items, trucks, rids=None, bids=None, deadline=None, pack_algos=PORTFOLIO_ALGOS,
+              sort_names=tuple(PORTFOLIO_SORTS), bin_algo="BFF", rotation=True, processes=None):
+    """
+    Pack with every engine crossed with every item order concurrently, and
+    return the cheapest plan. The incumbent cost is shared by the workers,
+    a member stops as soon as the trucks it opened cost as much. Members
+    not started by the deadline are cancelled and running ones switch to
+    the fallback algorithm, so every plan returned is complete. Everything
+    is cancelled once a plan reaches the lower bound (see
+    bounds.lower_bound()).
+
+    Arguments:
+        items (array_like): N x 2 item widths and heights
+        trucks (array_like): K x 3 truck widths, heights and costs
+        rids (array_like): Item ids, their index if None
+        bids (array_like): Truck ids, their index if None
+        deadline (float): Optional global time budget in seconds
+        pack_algos (sequence): Engines
+        sort_names (sequence): Item orders, keys of PORTFOLIO_SORTS
+        bin_algo (str): Bin selection heuristic
+        rotation (bool): Items can be rotated
+        processes (int): Worker processes, the number of CPUs if None. With
+            1 or less the members are run in the calling process.
+
+    Returns:
+        tuple (result, winner, lower_bound):
+            result (PackingResult): Cheapest plan, None if no member placed
+                every item
+            winner (tuple): (engine, item order name) of the cheapest plan
+            lower_bound (int, float): Lower bound on the cost
+    """
+    end_time = None if deadline is None else time.time() + deadline
+
+    items = np.asarray(items).reshape(-1, 2)
+    trucks = np.asarray(trucks).reshape(-1, 3)
+    rids = np.arange(len(items)) if rids is None else np.asarray(rids)
+    bids = list(range(len(trucks))) if bids is None else list(bids)
+
+    lower_bound = cost_lower_bound(items, trucks, rotation)
+    members = [(pack_algo, sort_name) for pack_algo in pack_algos for sort_name in sort_names]
+    tasks = [(items, trucks, rids, bids, pack_algo, PORTFOLIO_SORTS[sort_name], bin_algo, rotation,
+              end_time) for pack_algo, sort_name in members]
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    incumbent = multiprocessing.Value('d', math.inf)
+    results = []
+
+    if processes <= 1 or len(tasks) <= 1:
+        _init_worker(incumbent)
+        for task in tasks:
+            results.append(_run_member(task))
+            if incumbent.value <= lower_bound:
+                break
+    else:
+        with concurrent.futures.ProcessPoolExecutor(processes, initializer=_init_worker,
+                                                    initargs=(incumbent,)) as pool:
+            futures = [pool.submit(_run_member, task) for task in tasks]
+            timeout = None if end_time is None else max(0, end_time - time.time())
+            try:
+                for future in concurrent.futures.as_completed(futures, timeout=timeout):
+                    if future.result() is not None and incumbent.value <= lower_bound:
+                        break
+            except concurrent.futures.TimeoutError:
+                pass
+
+            # Running members stop by the end time on their own
+            for future in futures:
+                future.cancel()
+
+        results = [None if future.cancelled() else future.result() for future in futures]
+
+    # Cheapest plan, the first member on ties
+    complete = [(result.total_cost, member) for member, result in enumerate(results)
+                if result is not None]
+    if not complete:
+        return None, None, lower_bound
+
+    _, winner = min(complete)
+    return results[winner], members[winner], lower_bound
+
+
+def member_costs(items, trucks, pack_algos=PORTFOLIO_ALGOS, sort_names=tuple(PORTFOLIO_SORTS),
+                 bin_algo="BFF", rotation=True, processes=None):
+    """
+    Pack with every member of the portfolio to completion, without sharing
+    the incumbent, used to calibrate the algorithm selector.
+
+    Arguments:
+        See portfolio()
+
+    Returns:
+        dict: Cost by (engine name, item order name), None for the members
+            that couldn't place every item.
+    """
+    items = np.asarray(items).reshape(-1, 2)
+    trucks = np.asarray(trucks).reshape(-1, 3)
+
+    members = [(pack_algo, sort_name) for pack_algo in pack_algos for sort_name in sort_names]
+    tasks = [(items, trucks, pack_algo, PORTFOLIO_SORTS[sort_name], bin_algo, rotation)
+             for pack_algo, sort_name in members]
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    if processes <= 1 or len(tasks) <= 1:
+        costs = list(map(_member_cost, tasks))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+            costs = list(pool.map(_member_cost, tasks))
+
+    return {(pack_algo.__name__, sort_name): cost
+            for (pack_algo, sort_name), cost in zip(members, costs)}
@@ -0,0 +1,146 @@
+import os
+import time
+import concurrent.futures
+import numpy as np
+from .maxrects import MaxRectsBssf, MaxRectsBaf, MaxRectsBl
+from .skyline import SkylineBl
+from .guillotine import GuillotineBafMaxas
+from .geometry import Rectangle
+from .result import PackingResult
+
+# Algorithms tried in turn to repack the items of a bin into a cheaper one
+DOWNGRADE_ALGOS = (MaxRectsBssf, MaxRectsBaf, MaxRectsBl, SkylineBl, GuillotineBafMaxas)
+
+
+def _repack(task):
+    """
+    Pack a set of items into a single empty bin, trying each algorithm until
+    one places all of them.
+
+    Returns:
+        PackingAlgorithm: Closed bin holding every item
+        None: No algorithm could place all the items
+    """
+    items, width, height, cost, bid, rotation, pack_algos = task
+
+    for pack_algo in pack_algos:
+        abin = pack_algo(width, height, rot=rotation, bid=bid, cost=cost)
+        if all(abin.add_rect(w, h, rid) is not None for w, h, rid in items):
+            abin.close()
+            return abin
+
+    return None
+
+
+def _oracle_repack(task, oracle):
+    """
+    Same as _repack() but the items are placed as laid out by a
+    FeasibilityOracle, which also proves when they don't fit.
+    """
+    items, width, height, cost, bid, rotation, pack_algos = task
+
+    layout = oracle.layout([(w, h) for w, h, _ in items], width, height)
+    if not layout:
+        return None
+
+    abin = pack_algos[0](width, height, rot=rotation, bid=bid, cost=cost)
+    for (w, h, rid), (x, y, lw, lh) in zip(items, layout):
+        rect = Rectangle(x, y, lw, lh, rid)
+        rect.rotated = (lw, lh) != (w, h)
+        abin.rectangles.append(rect)
+    abin.close()
+    return abin
+
+
+def _bin_items(abin):
+    """
+    Items of a bin with their original orientation, largest first.
+    """
+    items = [(r.height, r.width, r.rid) if r.rotated else (r.width, r.height, r.rid)
+             for r in abin]
+    items.sort(key=lambda item: item[0] * item[1], reverse=True)
+    return items
+
+
+def downgrade_bins(packer, pack_algos=DOWNGRADE_ALGOS, max_candidates=4, processes=None,
+                   oracle=None):
+    """
+    Try to move the items of each used bin into a cheaper bin not used yet.
+
+    Candidate bins are filtered by cost, area and sides, only the
+    max_candidates cheapest of them are tried for each bin. Repacking the
+    items into every candidate is done in a process pool, then bins are
+    swapped for the cheapest candidate that holds all their items, largest
+    savings first, while candidate bins are left. The packer isn't modified.
+
+    Arguments:
+        packer (PackerMaster): Packer after pack()
+        pack_algos (sequence): Algorithms tried to repack the items
+        max_candidates (int): Maximum number of bins tried for each bin
+        processes (int): Worker processes, the number of CPUs if None. With
+            1 or less the items are repacked in the calling process.
+        oracle (FeasibilityOracle): Optional oracle the items are repacked
+            with instead, in the calling process so its memo is shared.
+
+    Returns:
+        tuple (result, saving, elapsed):
+            result (PackingResult): Packing with the cheaper bins swapped in
+            saving (int, float): Cost saved
+            elapsed (float): Time spent in seconds
+    """
+    start_time = time.perf_counter()
+    before = packer.result()
+
+    bins = [b for b in packer if b]
+    empty = packer.empty_bin_list()
+    if not bins or not empty:
+        return before, 0, time.perf_counter() - start_time
+
+    rotation = bins[0].rot
+    width, height, cost, count, bid = zip(*empty)
+    width, height, cost = np.array(width), np.array(height), np.array(cost)
+    long_side, short_side = np.maximum(width, height), np.minimum(width, height)
+    order = np.lexsort((-(width * height), cost))  # Cheapest first
+
+    tasks, pairs = [], []
+    for b, abin in enumerate(bins):
+        items = _bin_items(abin)
+        item_w = np.array([item[0] for item in items])
+        item_h = np.array([item[1] for item in items])
+
+        fits = (cost[order] < abin.cost) & (width[order] * height[order] >= (item_w * item_h).sum())
+        if rotation:
+            fits &= long_side[order] >= np.maximum(item_w, item_h).max()
+            fits &= short_side[order] >= np.minimum(item_w, item_h).max()
+        else:
+            fits &= (width[order] >= item_w.max()) & (height[order] >= item_h.max())
+
+        for k in order[fits][:max_candidates].tolist():
+            tasks.append((items, width[k].item(), height[k].item(), cost[k].item(), bid[k],
+                          rotation, tuple(pack_algos)))
+            pairs.append((b, k))
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    if oracle is not None:
+        packed = [_oracle_repack(task, oracle) for task in tasks]
+    elif processes <= 1 or len(tasks) <= 1:
+        packed = list(map(_repack, tasks))
+    else:
+        chunksize = max(1, len(tasks) // (4 * processes))
+        with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+            packed = list(pool.map(_repack, tasks, chunksize=chunksize))
+
+    # Swap bins, largest savings first, while candidate bins are left
+    swaps = sorted(((bins[b].cost - new_bin.cost, b, k, new_bin)
+                    for (b, k), new_bin in zip(pairs, packed) if new_bin is not None),
+                   key=lambda swap: swap[0], reverse=True)
+    left = list(count)
+    for _, b, k, new_bin in swaps:
+        if left[k] > 0 and bins[b].cost > new_bin.cost:
+            left[k] -= 1
+            bins[b] = new_bin
+
+    after = PackingResult(bins, degraded=before.degraded)
+    return after, before.total_cost - after.total_cost, time.perf_counter() - start_time
@@ -0,0 +1,157 @@
+import numpy as np
+from .packer import newPacker
+
+
+def fits_matrix(item_widths, item_heights, truck_widths, truck_heights, rotation=True):
+    """
+    Test which items fit inside which empty trucks.
+
+    Arguments:
+        item_widths, item_heights (array_like): Item dimensions
+        truck_widths, truck_heights (array_like): Truck dimensions
+        rotation (bool): Items can be rotated
+
+    Returns:
+        numpy.ndarray: N x K boolean matrix, True if item i fits in truck k
+    """
+    item_w = np.asarray(item_widths)[:, None]
+    item_h = np.asarray(item_heights)[:, None]
+    truck_w = np.asarray(truck_widths)[None, :]
+    truck_h = np.asarray(truck_heights)[None, :]
+
+    fits = (item_w <= truck_w) & (item_h <= truck_h)
+    if rotation:
+        fits |= (item_h <= truck_w) & (item_w <= truck_h)
+    return fits
+
+
+def max_trucks_used(truck_costs, upper_bound):
+    """
+    Upper bound on the number of trucks of any solution costing no more than
+    upper_bound, the number of cheapest trucks whose costs add up to it.
+    """
+    return int(np.searchsorted(np.cumsum(np.sort(truck_costs)), upper_bound, side='right'))
+
+
+def dominated_trucks(truck_widths, truck_heights, truck_costs, max_used, rotation=True,
+                     counts=None):
+    """
+    Find the trucks that can be removed without changing the optimal cost.
+
+    Truck a dominates truck b when b fits inside a, rotated if rotation is
+    enabled (the whole layout can be rotated), and a costs no more than b.
+    Identical trucks dominate the ones after them. When an optimal solution
+    using no more than max_used trucks uses b, and at least max_used trucks
+    dominating b are kept, one of them is unused and b's items can be moved
+    into it at no extra cost, so b is removed.
+
+    Arguments:
+        truck_widths, truck_heights, truck_costs (array_like): Trucks
+        max_used (int): Upper bound on the trucks used by an optimal solution,
+            the number of items is always a valid one.
+        rotation (bool): Items can be rotated
+        counts (array_like): Optional number of trucks of each type
+
+    Returns:
+        numpy.ndarray: Boolean mask, True for dominated trucks
+    """
+    width = np.asarray(truck_widths)
+    height = np.asarray(truck_heights)
+    cost = np.asarray(truck_costs)
+    counts = np.ones(len(cost), dtype=np.int64) if counts is None else np.asarray(counts)
+    index = np.arange(len(cost))
+
+    if rotation:
+        width, height = np.maximum(width, height), np.minimum(width, height)
+
+    # contains[a, b]: truck b fits inside truck a
+    contains = (width[:, None] >= width[None, :]) & (height[:, None] >= height[None, :])
+    dominates = contains & (cost[:, None] <= cost[None, :])
+
+    identical = contains & contains.T & (cost[:, None] == cost[None, :])
+    dominates &= ~identical | (index[:, None] < index[None, :])
+
+    # Trucks are visited cheapest and largest first, every truck dominating
+    # another one is visited before it.
+    dominated = np.zeros(len(cost), dtype=bool)
+    for b in np.lexsort((index, -(width + height), cost)):
+        if counts[dominates[:, b] & ~dominated].sum() >= max_used:
+            dominated[b] = True
+
+    return dominated
+
+
+def packing_upper_bound(items, trucks, rotation=True):
+    """
+    Cost of a quick first fit packing, trucks are tried from the lowest cost
+    per unit of area.
+
+    Arguments:
+        items (array_like): N x 2 item widths and heights
+        trucks (array_like): K x 3 truck widths, heights and costs
+        rotation (bool): Items can be rotated
+
+    Returns:
+        int, float: Total cost of the packing
+        None: Some items couldn't be packed
+    """
+    items = np.asarray(items).reshape(-1, 2)
+    trucks = np.asarray(trucks).reshape(-1, 3)
+    order = np.argsort(trucks[:, 2] / (trucks[:, 0] * trucks[:, 1]), kind='stable')
+
+    packer = newPacker(rotation=rotation)
+    packer.add_rects(items[:, 0], items[:, 1])
+    packer.add_bins(trucks[order, 0], trucks[order, 1], trucks[order, 2])
+    result = packer.pack()
+
+    return result.total_cost if len(result) == len(items) else None
+
+
+def prune_trucks(items, trucks, rotation=True, upper_bound=None):
+    """
+    Remove dominated trucks and trucks that can't hold any item.
+
+    Arguments:
+        items (array_like): N x 2 item widths and heights
+        trucks (array_like): K x 3 truck widths, heights and costs
+        rotation (bool): Items can be rotated
+        upper_bound (int, float): Optional cost of a known solution, used
+            to bound the number of trucks used.
+
+    Returns:
+        tuple (kept, fits):
+            kept (numpy.ndarray): Indexes of the trucks kept
+            fits (numpy.ndarray): N x len(kept) fits matrix of the kept trucks
+    """
+    items = np.asarray(items).reshape(-1, 2)
+    trucks = np.asarray(trucks).reshape(-1, 3)
+
+    fits = fits_matrix(items[:, 0], items[:, 1], trucks[:, 0], trucks[:, 1], rotation)
+
+    max_used = len(items)
+    if upper_bound is not None:
+        max_used = min(max_used, max_trucks_used(trucks[:, 2], upper_bound))
+
+    useless = ~fits.any(axis=0)
+    dominated = dominated_trucks(trucks[:, 0], trucks[:, 1], trucks[:, 2], max_used, rotation)
+
+    kept = np.flatnonzero(~(useless | dominated))
+    return kept, fits[:, kept]
+
+
+def prune_heuristic_trucks(items, trucks, rotation=True):
+    """
+    Truck pruning of the heuristic methods, shared by heuristic.py and the
+    selector calibration so the instance features match. Unlike the exact
+    methods, no cost upper bound is used: the bound assumes the optimum is
+    reached, and a heuristic may need more trucks than an optimal solution.
+
+    Arguments:
+        items (array_like): N x 2 item widths and heights
+        trucks (array_like): K x 3 truck widths, heights and costs
+        rotation (bool): Items can be rotated
+
+    Returns:
+        tuple (kept, fits): See prune_trucks()
+    """
+    return prune_trucks(items, trucks, rotation)
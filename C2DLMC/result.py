@@ -0,0 +1,90 @@
+import numpy as np
+
+
+class PackingResult(object):
+    """
+    Packing solution stored by columns, built with a single pass over the
+    bins. Only bins containing at least one rectangle are included, so bin
+    indexes are the same in every array.
+
+    Rectangle arrays (one entry per placed rectangle):
+        rect_bin: Index of the rectangle bin in the bin arrays
+        rect_bid: Bin id
+        x, y: Lower left corner coordinates
+        width, height: Placed dimensions (after rotation)
+        rotated: True if width and height were swapped to place it
+        rid: Rectangle id
+
+    Bin arrays (one entry per used bin):
+        bin_bid: Bin id
+        bin_width, bin_height: Bin dimensions
+        bin_cost: Bin cost
+        bin_utilization: Fraction of the bin area covered by rectangles
+
+    total_cost: Sum of the cost of all used bins
+    degraded: True if part of the rectangles were placed with a fast
+        fallback algorithm because the time budget was running out
+    """
+
+    def __init__(self, bins, degraded=False):
+        """
+        Arguments:
+            bins (iterable): PackingAlgorithm instances
+            degraded (bool): Fallback algorithm used
+        """
+        rect_bin, x, y, width, height, rotated, rid = [], [], [], [], [], [], []
+        bin_bid, bin_width, bin_height, bin_cost, bin_used = [], [], [], [], []
+
+        for abin in bins:
+            if not abin:
+                continue
+
+            index = len(bin_bid)
+            used_area = 0
+            for r in abin:
+                rect_bin.append(index)
+                x.append(r.x)
+                y.append(r.y)
+                width.append(r.width)
+                height.append(r.height)
+                rotated.append(r.rotated)
+                rid.append(r.rid)
+                used_area += r.width * r.height
+
+            bin_bid.append(abin.bid)
+            bin_width.append(abin.width)
+            bin_height.append(abin.height)
+            bin_cost.append(abin.cost or 0)
+            bin_used.append(used_area)
+
+        self.rect_bin = np.asarray(rect_bin, dtype=np.intp)
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.width = np.asarray(width)
+        self.height = np.asarray(height)
+        self.rotated = np.asarray(rotated, dtype=bool)
+        self.rid = np.empty(len(rid), dtype=object)
+        self.rid[:] = rid
+
+        self.bin_bid = np.empty(len(bin_bid), dtype=object)
+        self.bin_bid[:] = bin_bid
+        self.bin_width = np.asarray(bin_width)
+        self.bin_height = np.asarray(bin_height)
+        self.bin_cost = np.asarray(bin_cost)
+        self.bin_utilization = (np.asarray(bin_used, dtype=float) /
+                                (self.bin_width * self.bin_height)) if bin_bid else np.zeros(0)
+
+        self.rect_bid = self.bin_bid[self.rect_bin]
+        self.total_cost = sum(bin_cost)
+        self.degraded = degraded
+
+    def __len__(self):
+        return len(self.rect_bin)
+
+    @property
+    def num_bins(self):
+        return len(self.bin_bid)
+
+    def __repr__(self):
+        return "PackingResult(rects={}, bins={}, total_cost={}, degraded={})".format(
+            len(self), self.num_bins, self.total_cost, self.degraded)
@@ -0,0 +1,104 @@
+import time
+import random
+from .maxrects import MaxRectsBssf, MaxRectsBaf, MaxRectsBl
+from .skyline import SkylineBl
+from .guillotine import GuillotineBafMaxas
+
+# Algorithms drawn for the bins opened while recreating
+RECREATE_ALGOS = (MaxRectsBssf, MaxRectsBaf, MaxRectsBl, SkylineBl, GuillotineBafMaxas)
+
+# Keys the ruined rectangles are sorted by, largest first, before noise
+_RECREATE_ORDERS = (
+    lambda width, height: width * height,
+    lambda width, height: max(width, height),
+    lambda width, height: width + height,
+)
+
+
+def _waste(abin, by_cost):
+    """
+    How badly a bin is used, the higher the worse. Either its cost per unit
+    of area used, or its unused area fraction.
+    """
+    used = abin.used_area()
+    if by_cost:
+        return abin.cost / used if used > 0 else float('inf')
+    return 1 - used / (abin.width * abin.height)
+
+
+def _select_bins(packer, count, tournament, rng):
+    """
+    Select count distinct bins, each one the most wasteful of tournament
+    bins drawn at random. Bins are ranked by cost per area used or by
+    unused area, chosen at random for each selection.
+    """
+    selected = []
+    for _ in range(count):
+        by_cost = rng.random() < 0.5
+        candidates = {packer[rng.randrange(len(packer))] for _ in range(tournament)}
+        candidates.difference_update(selected)
+        if candidates:
+            selected.append(max(candidates, key=lambda b: _waste(b, by_cost)))
+
+    return selected
+
+
+def ruin_and_recreate(packer, budget, pack_algos=RECREATE_ALGOS, max_ruin=3, tournament=4,
+                      noise=0.2, seed=None, lower_bound=None):
+    """
+    Improve a packing until the time budget is used up. Each move removes
+    every rectangle from one to max_ruin wasteful bins, which become
+    available again, and reinserts them into the remaining bins and new
+    ones, in a randomized order and with a random algorithm for the new
+    bins. The move is kept if all the rectangles were placed and the total
+    cost dropped, otherwise it's undone. The search stops early once the
+    cost reaches lower_bound.
+
+    Bins are selected by sampling and the packer undo journal only reverts
+    what the move changed, so a move costs about the number of rectangles
+    moved, not the size of the packing.
+
+    Arguments:
+        packer (PackerMaster): Packer after pack(), it's left with the best
+            packing found.
+        budget (float): Time budget in seconds
+        pack_algos (sequence): Algorithms drawn for the new bins
+        max_ruin (int): Maximum number of bins emptied by a move
+        tournament (int): Bins sampled for each bin selected
+        noise (float): Relative noise added to the reinsertion sort keys
+        seed (int): Optional random seed
+        lower_bound (int, float): Optional lower bound on the cost
+
+    Returns:
+        tuple (result, saving, elapsed):
+            result (PackingResult): Best packing found
+            saving (int, float): Cost saved
+            elapsed (float): Time spent in seconds
+    """
+    start_time = time.perf_counter()
+    end_time = start_time + budget
+    rng = random.Random(seed)
+
+    initial_cost = cost = packer.total_cost()
+
+    while len(packer) > 0 and time.perf_counter() < end_time:
+        if lower_bound is not None and cost <= lower_bound:
+            break
+
+        snapshot = packer.snapshot()
+
+        count = rng.randint(1, min(max_ruin, len(packer)))
+        rects = packer.remove_bins(_select_bins(packer, count, tournament, rng), release=True)
+
+        order = rng.choice(_RECREATE_ORDERS)
+        rects.sort(key=lambda r: order(r[0], r[1]) * rng.uniform(1 - noise, 1 + noise),
+                   reverse=True)
+
+        unplaced = packer.insert_rects(rects, rng.choice(pack_algos))
+        if not unplaced and packer.total_cost() < cost:
+            cost = packer.total_cost()
+            packer.commit()
+        else:
+            packer.restore(snapshot)
+
+    return packer.result(), initial_cost - cost, time.perf_counter() - start_time
@@ -0,0 +1,130 @@
+import json
+import numpy as np
+from .portfolio import PORTFOLIO_ALGOS
+
+# Names of the values returned by instance_features()
+FEATURES = (
+    'log_items',       # log of the number of items
+    'log_trucks',      # log of the number of trucks
+    'ratio_mean',      # mean item long side / short side
+    'ratio_std',       # standard deviation of the same ratio
+    'duplicate_rate',  # fraction of items with the size of a previous one
+    'area_ratio',      # mean item area / mean truck area
+    'side_ratio',      # mean item long side / mean truck long side
+    'fill_ratio',      # total item area / total truck area
+)
+
+
+def instance_features(items, trucks):
+    """
+    Cheap features of an instance, computed with a few vectorized passes.
+
+    Arguments:
+        items (array_like): N x 2 item widths and heights
+        trucks (array_like): K x 3 truck widths, heights and costs
+
+    Returns:
+        numpy.ndarray: Values in the order of FEATURES
+    """
+    items = np.asarray(items, dtype=float).reshape(-1, 2)
+    trucks = np.asarray(trucks, dtype=float).reshape(-1, 3)
+
+    item_long, item_short = items.max(axis=1), items.min(axis=1)
+    ratio = item_long / item_short
+    item_area = items[:, 0] * items[:, 1]
+    truck_area = trucks[:, 0] * trucks[:, 1]
+
+    # Sizes are compared regardless of orientation
+    distinct = len(np.unique(np.column_stack((item_long, item_short)), axis=0))
+
+    return np.array([
+        np.log(len(items)),
+        np.log(len(trucks)),
+        ratio.mean(),
+        ratio.std(),
+        1 - distinct / len(items),
+        item_area.mean() / truck_area.mean(),
+        item_long.mean() / trucks[:, :2].max(axis=1).mean(),
+        item_area.sum() / truck_area.sum(),
+    ])
+
+
+class AlgorithmSelector(object):
+    """
+    Choose an engine and item order from a table of the cost every portfolio
+    member achieved on calibration instances. The instances nearest to the
+    one being solved, by their standardized features, are looked up and the
+    member with the lowest mean cost relative to the best one on each of
+    them is chosen.
+    """
+
+    def __init__(self, rows=None):
+        """
+        Arguments:
+            rows (list): Table rows as dicts with the instance 'name', its
+                'features' and the 'costs' by "engine item_order" member.
+        """
+        self.rows = list(rows or [])
+
+    def add(self, name, features, costs):
+        """
+        Add an instance to the table.
+
+        Arguments:
+            name (str): Instance name
+            features (array_like): Values returned by instance_features()
+            costs (dict): Cost by (engine name, item order name), None for
+                members that couldn't place every item.
+        """
+        self.rows.append({'name': name,
+                          'features': [float(v) for v in features],
+                          'costs': {f"{algo} {sort_name}": cost
+                                    for (algo, sort_name), cost in costs.items()}})
+
+    def select(self, features, neighbors=3):
+        """
+        Arguments:
+            features (array_like): Values returned by instance_features()
+            neighbors (int): Number of nearest instances compared
+
+        Returns:
+            tuple (PackingAlgorithm, str): Engine and item order name
+        """
+        if not self.rows:
+            raise ValueError("Empty performance table")
+
+        table = np.array([row['features'] for row in self.rows])
+        mean, std = table.mean(axis=0), table.std(axis=0)
+        std[std == 0] = 1
+
+        distance = np.linalg.norm((table - mean) / std - (np.asarray(features) - mean) / std, axis=1)
+        nearest = np.argsort(distance, kind='stable')[:neighbors]
+
+        # Mean of the cost relative to the best member of each instance,
+        # members that failed count twice the best cost.
+        relative = {}
+        for i in nearest.tolist():
+            costs = self.rows[i]['costs']
+            best = min(cost for cost in costs.values() if cost is not None)
+            for member, cost in costs.items():
+                relative.setdefault(member, []).append(cost / best if cost is not None else 2)
+
+        # Members are compared in table order, the first one wins on ties
+        member = min(relative, key=lambda m: np.mean(relative[m]))
+        algo_name, sort_name = member.split()
+
+        algos = {algo.__name__: algo for algo in PORTFOLIO_ALGOS}
+        return algos[algo_name], sort_name
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump({'features': FEATURES, 'rows': self.rows}, f, indent=1)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            table = json.load(f)
+
+        if tuple(table['features']) != FEATURES:
+            raise ValueError("Performance table built with different features, calibrate again")
+        return cls(table['rows'])
@@ -0,0 +1,120 @@
+from .pack_algo import PackingAlgorithm
+from .geometry import Rectangle
+
+
+class ShelfNf(PackingAlgorithm):
+    """Shelf Next Fit, as described by
+    Jukka Jylanki - A Thousand Ways to Pack the Bin (February 27, 2010)
+
+    Rectangles are placed left to right in horizontal shelves, only the last
+    shelf is used and when a rectangle doesn't fit in it a new shelf is
+    started on top. Placement is O(1), so it's used as a fast fallback when
+    there is no time left for better algorithms.
+    """
+
+    def __init__(self, width, height, rot=True, *args, **kwargs):
+        super(ShelfNf, self).__init__(width, height, rot, *args, **kwargs)
+
+    def _orientations(self, width, height):
+        if self.rot and width != height:
+            return ((width, height), (height, width))
+        return ((width, height),)
+
+    def _select_position(self, width, height):
+        """
+        Returns:
+            tuple (Rectangle, bool): Placement, and True if a new shelf
+                has to be started for it.
+            tuple (None, None): The rectangle can't be placed
+        """
+        # The last shelf has nothing above so it can grow taller, the
+        # orientation that raises it less and fills it best is preferred.
+        fit = [(w, h) for w, h in self._orientations(width, height)
+               if self._shelf_x + w <= self.width and self._shelf_y + h <= self.height]
+        if fit:
+            w, h = min(fit, key=lambda o: (max(o[1] - self._shelf_height, 0), -o[1]))
+            return Rectangle(self._shelf_x, self._shelf_y, w, h), False
+
+        # Start a new shelf with the flattest orientation
+        top = self._shelf_y + self._shelf_height
+        fit = [(w, h) for w, h in self._orientations(width, height)
+               if w <= self.width and top + h <= self.height]
+        if fit:
+            w, h = min(fit, key=lambda o: o[1])
+            return Rectangle(0, top, w, h), True
+
+        return None, None
+
+    def _update_bounds(self):
+        """
+        Free space is the rest of the last shelf up to the top of the
+        surface, and the full width area above the last shelf.
+        """
+        shelf_width = self.width - self._shelf_x
+        shelf_height = self.height - self._shelf_y
+        above_height = shelf_height - self._shelf_height
+        above_width = self.width if above_height > 0 else 0
+
+        self._bounds = (max(shelf_width, above_width),
+                        shelf_height if shelf_width > 0 else above_height,
+                        max(shelf_width * shelf_height, above_width * above_height))
+
+    def fitness(self, width, height):
+        """
+        The lower the top of the rectangle once placed the better.
+        """
+        assert (width > 0 and height > 0)
+        if self._exceeds_bounds(width, height):
+            return None
+
+        rect, _ = self._select_position(width, height)
+        if rect is None:
+            return None
+
+        return rect.top
+
+    def add_rect(self, width, height, rid=None):
+        assert (width > 0 and height > 0)
+        if self._exceeds_bounds(width, height):
+            return None
+
+        rect, new_shelf = self._select_position(width, height)
+        if rect is None:
+            return None
+
+        if new_shelf:
+            self._shelf_y = rect.y
+            self._shelf_x = 0
+            self._shelf_height = 0
+
+        self._shelf_x += rect.width
+        self._shelf_height = max(self._shelf_height, rect.height)
+        self._update_bounds()
+        self._version += 1
+
+        rect.rid = rid
+        rect.rotated = rect.width != width
+        self.rectangles.append(rect)
+        return rect
+
+    def _rebuild(self):
+        # A new shelf on top of every rectangle placed
+        self._shelf_y = max((r.top for r in self.rectangles), default=0)
+        self._shelf_x = 0
+        self._shelf_height = 0
+        self._update_bounds()
+
+    def snapshot(self):
+        return (super(ShelfNf, self).snapshot(),
+                (self._shelf_x, self._shelf_y, self._shelf_height))
+
+    def restore(self, snapshot):
+        snapshot, (self._shelf_x, self._shelf_y, self._shelf_height) = snapshot
+        super(ShelfNf, self).restore(snapshot)
+
+    def reset(self):
+        super(ShelfNf, self).reset()
+        self._shelf_x = 0  # Where the next rectangle in the last shelf goes
+        self._shelf_y = 0  # Bottom of the last shelf
+        self._shelf_height = 0  # Height of the tallest rectangle in it
+        self._update_bounds()
@@ -157,6 +157,17 @@ class Skyline(PackingAlgorithm):
         # Aaaaand ..... Done
         self._skyline = list(skylineq)
 
+    def _update_bounds(self):
+        """
+        Recalculate capacity bounds, rectangles are always placed over the
+        skyline so the free area is the area above it.
+        """
+        max_height = self.height - min(s.top for s in self._skyline)
+        free_area = sum(s.length * (self.height - s.top) for s in self._skyline)
+        max_width = self.width if max_height > 0 else 0
+
+        self._bounds = (max_width, max_height, free_area)
+
     def _rect_fitness(self, rect, left_index, right_index):
         return rect.top
 
@@ -180,13 +191,12 @@ class Skyline(PackingAlgorithm):
         """Search for the best fitness
         """
         assert (width > 0 and height > 0)
-        if width > max(self.width, self.height) or \
-                height > max(self.height, self.width):
+        if self._exceeds_bounds(width, height):
             return None
 
         # Get best fitness segment, for normal rectangle, and for
         # rotated rectangle if rotation is enabled.
-        rect, fitness = self._select_position(width, height)
+        rect, fitness = self._memoized(self._select_position, width, height)
         return fitness
 
     def add_rect(self, width, height, rid=None):
@@ -194,29 +204,104 @@ class Skyline(PackingAlgorithm):
         Add new rectangle
         """
         assert (width > 0 and height > 0)
-        if width > max(self.width, self.height) or \
-                height > max(self.height, self.width):
+        if self._exceeds_bounds(width, height):
             return None
 
         rect = None
 
         # Get best possible rectangle position
         if not rect:
-            rect, _ = self._select_position(width, height)
+            rect, _ = self._memoized(self._select_position, width, height)
             if rect:
                 self._add_skyline(rect)
+                self._update_bounds()
+                self._version += 1
 
         if rect is None:
             return None
 
         # Store rectangle, and recalculate skyline
         rect.rid = rid
+        rect.rotated = rect.width != width
         self.rectangles.append(rect)
         return rect
 
+    def add_copies(self, width, height, rids):
+        """
+        Add one rectangle of width x height dimensions for each rid, copies
+        are tiled over the skyline to the right of and above the position
+        selected for the first one, and the skyline is updated once for the
+        whole tile block.
+        """
+        assert (width > 0 and height > 0)
+        placed = []
+
+        while len(placed) < len(rids):
+            if self._exceeds_bounds(width, height):
+                break
+
+            rect, _ = self._memoized(self._select_position, width, height)
+            if rect is None:
+                break
+
+            # Free region extends right while the skyline stays below rect.
+            region_right = rect.right
+            for sky in self._skyline:
+                if sky.right <= rect.left:
+                    continue
+                if sky.left >= rect.right and sky.top > rect.bottom:
+                    break
+                region_right = max(region_right, sky.right)
+
+            block, tiles = self._tile(rect.x, rect.y, rect.width, rect.height,
+                                      region_right - rect.x, self.height - rect.y,
+                                      len(rids) - len(placed))
+            self._add_skyline(block)
+            self._update_bounds()
+            self._version += 1
+
+            for tile, rid in zip(tiles, rids[len(placed):]):
+                tile.rid = rid
+                tile.rotated = tile.width != width
+            self.rectangles.extend(tiles)
+            placed.extend(tiles)
+
+        return placed
+
+    def snapshot(self):
+        return super(Skyline, self).snapshot(), self._skyline
+
+    def restore(self, snapshot):
+        snapshot, self._skyline = snapshot
+        super(Skyline, self).restore(snapshot)
+
+    def _rebuild(self):
+        """
+        The skyline is rebuilt as the upper envelope of the rectangles
+        placed, free space below the envelope can't be used.
+        """
+        edges = {0, self.width}
+        for r in self.rectangles:
+            edges.update((r.left, r.right))
+        edges = sorted(edges)
+
+        skylineq = collections.deque([])
+        for left, right in zip(edges, edges[1:]):
+            top = max((r.top for r in self.rectangles if r.left <= left and r.right >= right),
+                      default=0)
+            self._merge_skyline(skylineq, HSegment(Point(left, top), right - left))
+
+        self._skyline = list(skylineq)
+        self._update_bounds()
+
+    def close(self):
+        super(Skyline, self).close()
+        self._skyline = []
+
     def reset(self):
         super(Skyline, self).reset()
         self._skyline = [HSegment(Point(0, 0), self.width)]
+        self._update_bounds()
 
 
 class SkylineBl(Skyline):
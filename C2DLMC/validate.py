@@ -0,0 +1,128 @@
+def find_outside(width, height, rects):
+    """
+    Find a rectangle not fully inside a width x height surface.
+
+    Arguments:
+        width (int, float): Surface width
+        height (int, float): Surface height
+        rects (sequence): (x, y, width, height) of each rectangle
+
+    Returns:
+        int: Index of the first rectangle outside the surface
+        None: All rectangles are inside
+    """
+    for i, (x, y, w, h) in enumerate(rects):
+        if w <= 0 or h <= 0 or x < 0 or y < 0 or x + w > width or y + h > height:
+            return i
+
+    return None
+
+
+class _RankSet(object):
+    """
+    Set of the integers 0 to size - 1 as a Fenwick tree of counts, with
+    insertion, removal and the nearest members of a value in O(log size).
+    """
+
+    def __init__(self, size):
+        self._tree = [0] * (size + 1)
+        self._len = 0
+        self._top = 1 << size.bit_length()  # Highest power of two searched
+
+    def _update(self, k, delta):
+        self._len += delta
+        k += 1
+        while k < len(self._tree):
+            self._tree[k] += delta
+            k += k & -k
+
+    def add(self, k):
+        self._update(k, 1)
+
+    def remove(self, k):
+        self._update(k, -1)
+
+    def _count_below(self, k):
+        count = 0
+        while k > 0:
+            count += self._tree[k]
+            k -= k & -k
+        return count
+
+    def _nth(self, n):
+        # Smallest member with n members below it
+        k, step = 0, self._top
+        while step:
+            if k + step < len(self._tree) and self._tree[k + step] <= n:
+                k += step
+                n -= self._tree[k]
+            step >>= 1
+        return k
+
+    def next(self, k):
+        """
+        Smallest member not below k, None when there's none.
+        """
+        count = self._count_below(k)
+        return self._nth(count) if count < self._len else None
+
+    def prev(self, k):
+        """
+        Largest member below k, None when there's none.
+        """
+        count = self._count_below(k)
+        return self._nth(count - 1) if count > 0 else None
+
+
+def find_collision(rects):
+    """
+    Find two overlapping rectangles in O(n log n) with a sweep line moving
+    left to right. The rectangles crossing the line are kept in a set of
+    their ranked bottoms, while no overlap has been found they are
+    disjoint, so a new rectangle can only overlap the ones just below and
+    above it. Rectangles touching by their edges don't overlap.
+
+    Arguments:
+        rects (sequence): (x, y, width, height) of each rectangle, width
+            and height must be positive.
+
+    Returns:
+        tuple (int, int): Indexes of two overlapping rectangles
+        None: No rectangles overlap
+    """
+    # Rectangles leaving the line are removed before the ones entering
+    # at the same x are added.
+    events = []
+    for i, (x, y, w, h) in enumerate(rects):
+        events.append((x, 1, i))
+        events.append((x + w, 0, i))
+    events.sort()
+
+    # Disjoint rectangles crossing the line have distinct bottoms, so each
+    # rank is held by at most one of them.
+    bottoms = sorted({r[1] for r in rects})
+    rank = {bottom: k for k, bottom in enumerate(bottoms)}
+    active, owner = _RankSet(len(bottoms)), [None] * len(bottoms)
+
+    for _, entering, i in events:
+        bottom = rects[i][1]
+        k = rank[bottom]
+
+        if not entering:
+            active.remove(k)
+            continue
+
+        top = bottom + rects[i][3]
+        above = active.next(k)
+        if above is not None and bottoms[above] < top:
+            return owner[above], i
+        below = active.prev(k)
+        if below is not None:
+            below = owner[below]
+            if rects[below][1] + rects[below][3] > bottom:
+                return below, i
+
+        active.add(k)
+        owner[k] = i
+
+    return None
@@ -1,6 +1,9 @@
 import os
 import time
 from ortools.sat.python import cp_model
+from C2DLMC.preprocess import packing_upper_bound, prune_trucks
+from C2DLMC.bounds import lower_bound, gap
+from C2DLMC import newPacker, SORT_AREA
 
 
 def input_data(file_path):
@@ -25,75 +28,93 @@ def input_data(file_path):
 
 def process_test_case(data, time_limit):
     N = data['N']
-    K = data['K']
     items = data['items']
-    trucks = data['trucks']
 
-    max_width = max(x[0] for x in trucks)
-    max_height = max(x[1] for x in trucks)
+    # Only trucks that may be part of an optimal solution, and item/truck
+    # pairs where the item fits get variables.
+    upper_bound = packing_upper_bound(items, data['trucks'])
+    kept, fits = prune_trucks(items, data['trucks'], upper_bound=upper_bound)
+    trucks = [data['trucks'][j] for j in kept]
+    K = len(trucks)
+    bound = lower_bound(items, trucks, fits=fits)
 
+    build_start = time.time()
     model = cp_model.CpModel()
 
-    X = {}
-    R = []
-    for i in range(N):
-        R.append(model.NewBoolVar(f'item_{i}_rotated'))
-        for j in range(K):
-            X[i, j] = model.NewBoolVar(f'item_{i}_in_truck_{j}')
+    # One literal per item, truck and orientation the item fits in, with
+    # optional x and y intervals in that truck enforced by it. Each truck
+    # gets a single NoOverlap2D over the intervals of its items, so the
+    # model has O(N K) variables and constraints.
+    P, L, B = {}, {}, {}
+    truck_x = [[] for _ in range(K)]
+    truck_y = [[] for _ in range(K)]
+    for i, j in zip(*(axis.tolist() for axis in fits.nonzero())):
+        w, h = items[i]
+        for o, (ow, oh) in enumerate(((w, h), (h, w)) if w != h else ((w, h),)):
+            if ow > trucks[j][0] or oh > trucks[j][1]:
+                continue
+            P[i, j, o] = model.NewBoolVar(f'item_{i}_in_truck_{j}_rotated_{o}')
+            L[i, j, o] = model.NewIntVar(0, trucks[j][0] - ow, f'l_{i}_{j}_{o}')
+            B[i, j, o] = model.NewIntVar(0, trucks[j][1] - oh, f'b_{i}_{j}_{o}')
+            truck_x[j].append(model.NewOptionalFixedSizeIntervalVar(L[i, j, o], ow, P[i, j, o],
+                                                                    f'x_{i}_{j}_{o}'))
+            truck_y[j].append(model.NewOptionalFixedSizeIntervalVar(B[i, j, o], oh, P[i, j, o],
+                                                                    f'y_{i}_{j}_{o}'))
 
     Z = [model.NewBoolVar(f'truck_{j}_is_used') for j in range(K)]
 
-    r = []
-    l = []
-    t = []
-    b = []
-    for i in range(N):
-        r.append(model.NewIntVar(0, max_width, f'r_{i}'))
-        l.append(model.NewIntVar(0, max_width, f'l_{i}'))
-        t.append(model.NewIntVar(0, max_height, f't_{i}'))
-        b.append(model.NewIntVar(0, max_height, f'b_{i}'))
-
-        model.Add(r[i] == l[i] + items[i][0]).OnlyEnforceIf(R[i].Not())
-        model.Add(r[i] == l[i] + items[i][1]).OnlyEnforceIf(R[i])
-        model.Add(t[i] == b[i] + items[i][1]).OnlyEnforceIf(R[i].Not())
-        model.Add(t[i] == b[i] + items[i][0]).OnlyEnforceIf(R[i])
+    item_literals = [[] for _ in range(N)]
+    truck_area = [[] for _ in range(K)]
+    for (i, j, o), p in P.items():
+        item_literals[i].append(p)
+        truck_area[j].append(items[i][0] * items[i][1] * p)
+        model.AddImplication(p, Z[j])
 
     for i in range(N):
-        model.Add(sum(X[i, j] for j in range(K)) == 1)
+        model.AddExactlyOne(item_literals[i])
 
-    for i in range(N):
-        for j in range(K):
-            model.Add(r[i] <= trucks[j][0]).OnlyEnforceIf(X[i, j])
-            model.Add(t[i] <= trucks[j][1]).OnlyEnforceIf(X[i, j])
+    for j in range(K):
+        model.AddNoOverlap2D(truck_x[j], truck_y[j])
 
-    for i in range(N):
-        for k in range(i + 1, N):
-            a1 = model.NewBoolVar('a1')
-            model.Add(r[i] <= l[k]).OnlyEnforceIf(a1)
-            model.Add(r[i] > l[k]).OnlyEnforceIf(a1.Not())
-            a2 = model.NewBoolVar('a2')
-            model.Add(t[i] <= b[k]).OnlyEnforceIf(a2)
-            model.Add(t[i] > b[k]).OnlyEnforceIf(a2.Not())
-            a3 = model.NewBoolVar('a3')
-            model.Add(r[k] <= l[i]).OnlyEnforceIf(a3)
-            model.Add(r[k] > l[i]).OnlyEnforceIf(a3.Not())
-            a4 = model.NewBoolVar('a4')
-            model.Add(t[k] <= b[i]).OnlyEnforceIf(a4)
-            model.Add(t[k] > b[i]).OnlyEnforceIf(a4.Not())
-
-            for j in range(K):
-                model.AddBoolOr([a1, a2, a3, a4]).OnlyEnforceIf([X[i, j], X[k, j]])
+        # Redundant, the item area fits in the truck area when it's used
+        model.Add(sum(truck_area[j]) <= trucks[j][0] * trucks[j][1] * Z[j])
 
+    # Identical trucks are used in order
+    previous = {}
     for j in range(K):
-        b1 = model.NewBoolVar('b')
-        model.Add(sum(X[i, j] for i in range(N)) == 0).OnlyEnforceIf(b1)
-        model.Add(Z[j] == 0).OnlyEnforceIf(b1)
-        model.Add(sum(X[i, j] for i in range(N)) != 0).OnlyEnforceIf(b1.Not())
-        model.Add(Z[j] == 1).OnlyEnforceIf(b1.Not())
+        if trucks[j] in previous:
+            model.AddImplication(Z[j], Z[previous[trucks[j]]])
+        previous[trucks[j]] = j
 
     cost = sum(Z[j] * trucks[j][2] for j in range(K))
     model.Minimize(cost)
 
+    # Start the search from a heuristic packing, finding a first solution
+    # is otherwise the hard part with many optional intervals.
+    packer = newPacker(sort_algo=SORT_AREA, cost_aware=True)
+    packer.add_rects([w for w, _ in items], [h for _, h in items], list(range(N)))
+    packer.add_bins([x[0] for x in trucks], [x[1] for x in trucks], [x[2] for x in trucks],
+                    bids=list(range(K)))
+    hint = packer.pack()
+    placed = {}
+    for i, j, x, y, rotated in zip(hint.rid.tolist(), hint.rect_bid.tolist(), hint.x.tolist(),
+                                   hint.y.tolist(), hint.rotated.tolist()):
+        placed[i] = (j, int(rotated and items[i][0] != items[i][1]), x, y)
+    for (i, j, o), p in P.items():
+        position = placed.get(i)
+        chosen = position is not None and position[:2] == (j, o)
+        model.AddHint(p, chosen)
+        model.AddHint(L[i, j, o], position[2] if chosen else 0)
+        model.AddHint(B[i, j, o], position[3] if chosen else 0)
+    used = set(hint.bin_bid.tolist())
+    for j in range(K):
+        model.AddHint(Z[j], j in used)
+
+    # Valid for any solution, the search stops as soon as a solution
+    # reaches it since it's then proven optimal.
+    model.Add(cost >= bound)
+    build_time = time.time() - build_start
+
     solver = cp_model.CpSolver()
     solver.parameters.max_time_in_seconds = time_limit
 
@@ -103,30 +124,25 @@ def process_test_case(data, time_limit):
 
     if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
         result = []
-        for i in range(N):
-            item_result = [i + 1]
-            for j in range(K):
-                if solver.Value(X[i, j]) == 1:
-                    item_result.append(j + 1)
-            item_result.append(int(solver.Value(l[i])))
-            item_result.append(int(solver.Value(b[i])))
-            item_result.append(int(solver.Value(R[i])))
-            result.append(item_result)
+        for (i, j, o), p in sorted(P.items()):
+            if solver.Value(p):
+                result.append([i + 1, int(kept[j]) + 1, int(solver.Value(L[i, j, o])),
+                               int(solver.Value(B[i, j, o])), o])
 
         num_trucks_used = int(sum(solver.Value(Z[j]) for j in range(K)))
         total_cost = solver.ObjectiveValue()
         running_time = end_time - start_time
 
-        return result, num_trucks_used, total_cost, running_time
+        return result, num_trucks_used, total_cost, build_time, running_time, bound
     else:
-        return None, None, None, None
+        return None, None, None, build_time, None, bound
 
 
 def main_solver(testcase_folder, time_limit):
     for testcase_filename in os.listdir(testcase_folder):
         testcase_path = os.path.join(testcase_folder, testcase_filename)
         data = input_data(testcase_path)
-        result, num_trucks_used, total_cost, running_time = process_test_case(data, time_limit)
+        result, num_trucks_used, total_cost, build_time, running_time, bound = process_test_case(data, time_limit)
 
         if result is not None:
             print(f"Test case {testcase_filename}:")
@@ -134,6 +150,8 @@ def main_solver(testcase_folder, time_limit):
                 print(' '.join(map(str, item_result)))
             print(f'Number of trucks used: {num_trucks_used}')
             print(f'Total cost: {total_cost}')
+            print(f'Lower bound: {bound}, Gap: {gap(total_cost, bound):.2%}')
+            print(f'Build time: {build_time:.4f} seconds')
             print(f'Running time: {running_time:.4f} seconds')
         else:
             print(f"Test case {testcase_filename}: No feasible solution found")
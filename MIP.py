@@ -1,6 +1,7 @@
 import os
 import time
 from ortools.linear_solver import pywraplp
+from C2DLMC.preprocess import packing_upper_bound, prune_trucks
 
 
 def input_data(testcase_path):
@@ -30,6 +31,16 @@ def input_data(testcase_path):
 def process_test_case(testcase_path):
     n, k, data, W_truck, H_truck = input_data(testcase_path)
 
+    # Keep only trucks that may be part of an optimal solution, and create
+    # assignment variables only for items that fit in the truck.
+    trucks = [(W_truck[m], H_truck[m], data['cost'][m]) for m in range(k)]
+    kept, fits = prune_trucks(data['size_item'], trucks,
+                              upper_bound=packing_upper_bound(data['size_item'], trucks))
+    W_truck = [W_truck[m] for m in kept]
+    H_truck = [H_truck[m] for m in kept]
+    data['cost'] = [data['cost'][m] for m in kept]
+    k = len(kept)
+
     max_W = max(W_truck)
     max_H = max(H_truck)
 
@@ -58,6 +69,8 @@ def process_test_case(testcase_path):
         solver.Add(t[i] == b[i] + (1 - o[i]) * data['size_item'][i][1] + o[i] * data['size_item'][i][0])
 
         for m in range(k):
+            if not fits[i, m]:
+                continue
             z[(i, m)] = solver.IntVar(0, 1, 'z_[%i]_[%i]' % (i, m))
 
             # item i must not exceed area of truck
@@ -68,12 +81,15 @@ def process_test_case(testcase_path):
 
     # each item must be packed in 1 truck
     for i in range(n):
-        solver.Add(sum(z[(i, m)] for m in range(k)) == 1)
+        solver.Add(sum(z[(i, m)] for m in range(k) if fits[i, m]) == 1)
 
     # if 2 items are packed in the same truck, they must not overlap
     for i in range(n - 1):
         for j in range(i + 1, n):
             for m in range(k):
+                if not (fits[i, m] and fits[j, m]):
+                    continue
+
                 # add variable e = z[i,m] x z[j,m]
                 e = solver.IntVar(0, 1, f'e[{i}][{j}]')
                 solver.Add(e >= z[i, m] + z[j, m] - 1)
@@ -103,7 +119,7 @@ def process_test_case(testcase_path):
         # else, used[m] = 0
 
         q = solver.IntVar(0, n, f'q[{m}]')
-        solver.Add(q == sum(z[(i, m)] for i in range(n)))
+        solver.Add(q == sum(z[(i, m)] for i in range(n) if fits[i, m]))
         # truck m is used if there are at least 1 item packed in it, so sum(z[(i, m)] for i in range(n)) != 0
 
         # q = 0 => used[m] = 0
@@ -126,8 +142,8 @@ def process_test_case(testcase_path):
         for i in range(n):
             item_result = [i + 1]
             for j in range(k):
-                if z[i, j].solution_value() == 1:
-                    item_result.append(j + 1)
+                if fits[i, j] and z[i, j].solution_value() == 1:
+                    item_result.append(int(kept[j]) + 1)
             item_result.append(int(l[i].solution_value()))
             item_result.append(int(b[i].solution_value()))
             item_result.append(int(o[i].solution_value()))
@@ -1,6 +1,8 @@
 import os
 import time
 import sys
+from C2DLMC.preprocess import packing_upper_bound, prune_trucks
+from C2DLMC.bounds import lower_bound, gap
 
 # Constants
 MAX_N = 1000
@@ -14,9 +16,9 @@ def canPlace(i, k, x, y, o, w, l, W, L, result_t, result_x, result_y, result_o):
     for j in range(i):
         if result_t[j] == k and not (
             x + w[i] * (1 - o) + l[i] * o <= result_x[j] or
-            result_x[j] + w[j] * (1 - o) + l[j] * o <= x or
+            result_x[j] + w[j] * (1 - result_o[j]) + l[j] * result_o[j] <= x or
             y + w[i] * o + l[i] * (1 - o) <= result_y[j] or
-            result_y[j] + w[j] * o + l[j] * (1 - o) <= y):
+            result_y[j] + w[j] * result_o[j] + l[j] * (1 - result_o[j]) <= y):
             return False
     return True
 
@@ -29,7 +31,11 @@ def calcCost(K, c, used):
     return totalCost
 
 # Backtracking function
-def Try(i, N, K, w, l, W, L, c, result_t, result_x, result_y, result_o, solution_t, solution_x, solution_y, solution_o, used, min_cost):
+def Try(i, N, K, w, l, W, L, c, fits, result_t, result_x, result_y, result_o, solution_t, solution_x, solution_y, solution_o, used, min_cost, bound):
+    # Stop as soon as a solution reaches the lower bound
+    if min_cost[0] <= bound:
+        return
+
     if i == N:
         tmp = calcCost(K, c, used)
         if tmp < min_cost[0]:
@@ -42,6 +48,8 @@ def Try(i, N, K, w, l, W, L, c, result_t, result_x, result_y, result_o, solution
         return
 
     for k in range(K):
+        if not fits[i][k]:
+            continue
         for x in range(0, W[k] - w[i] + 1, 10):
             for y in range(0, L[k] - l[i] + 1, 10):
                 for o in range(2):
@@ -52,7 +60,7 @@ def Try(i, N, K, w, l, W, L, c, result_t, result_x, result_y, result_o, solution
                         result_y[i] = y
                         result_o[i] = o
                         if calcCost(K, c, used) < min_cost[0]:
-                            Try(i + 1, N, K, w, l, W, L, c, result_t, result_x, result_y, result_o, solution_t, solution_x, solution_y, solution_o, used, min_cost)
+                            Try(i + 1, N, K, w, l, W, L, c, fits, result_t, result_x, result_y, result_o, solution_t, solution_x, solution_y, solution_o, used, min_cost, bound)
                         used[k] -= 1
 
 # Function to process a single test case
@@ -73,6 +81,18 @@ def process_test_case(testcase_path):
     for k in range(K):
         W[k], L[k], c[k] = map(int, lines[1 + N + k].split())
 
+    # Drop trucks that can't be part of an optimal solution, and skip the
+    # trucks an item doesn't fit in
+    items = list(zip(w, l))
+    trucks = list(zip(W, L, c))
+    kept, fits = prune_trucks(items, trucks, upper_bound=packing_upper_bound(items, trucks))
+    bound = lower_bound(items, [trucks[k] for k in kept], fits=fits)
+    fits = fits.tolist()
+    W = [W[k] for k in kept]
+    L = [L[k] for k in kept]
+    c = [c[k] for k in kept]
+    K = len(kept)
+
     result_t = [-1] * N
     result_x = [0] * N
     result_y = [0] * N
@@ -87,16 +107,17 @@ def process_test_case(testcase_path):
     min_cost = [sys.maxsize]
 
     start_time = time.time()
-    Try(0, N, K, w, l, W, L, c, result_t, result_x, result_y, result_o, solution_t, solution_x, solution_y, solution_o, used, min_cost)
+    Try(0, N, K, w, l, W, L, c, fits, result_t, result_x, result_y, result_o, solution_t, solution_x, solution_y, solution_o, used, min_cost, bound)
     end_time = time.time()
 
     total_cost = min_cost[0]
     total_time = end_time - start_time
 
     # Print result
-    print(f"Test case {testcase_path}: Total cost = {total_cost}, Time to run = {total_time:.4f} seconds")
+    print(f"Test case {testcase_path}: Total cost = {total_cost}, Lower bound = {bound}, "
+          f"Gap = {gap(total_cost, bound):.2%}, Time to run = {total_time:.4f} seconds")
     for j in range(N):
-        print(f"{j + 1} {solution_t[j] + 1} {solution_x[j]} {solution_y[j]} {solution_o[j]}")
+        print(f"{j + 1} {kept[solution_t[j]] + 1} {solution_x[j]} {solution_y[j]} {solution_o[j]}")
 
 # Directory containing test cases
 testcase_folder = 'testcase'
@@ -0,0 +1,71 @@
+import os
+import time
+import argparse
+import numpy as np
+from C2DLMC.preprocess import prune_heuristic_trucks
+from C2DLMC.portfolio import member_costs
+from C2DLMC.selector import AlgorithmSelector, instance_features
+from check_solution import read_instance
+
+
+def synthetic_instance(rng):
+    """
+    Random instance shaped like the test cases: sides multiple of 10,
+    as many trucks as items with costs from 2 to 31, and a varying number
+    of items, item size and share of repeated item sizes.
+    """
+    N = int(rng.integers(50, 1500))
+    max_side = int(rng.choice([100, 200, 300, 400]))
+
+    # Items are drawn from a pool of distinct sizes
+    pool = rng.integers(1, max_side // 10 + 1, size=(max(1, int(N * rng.uniform(0.1, 1))), 2)) * 10
+    items = pool[rng.integers(len(pool), size=N)]
+
+    trucks = np.column_stack((rng.integers(2, 61, size=(N, 2)) * 10, rng.integers(2, 32, size=N)))
+    trucks[0, :2] = 600  # At least one truck holds any item
+
+    return items, trucks
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Record the cost of every portfolio member on the test cases and synthetic instances, "
+                    "the table is used by heuristic.py --select.")
+    parser.add_argument('--testcase_folder', type=str, default='testcase', help='Folder containing test cases')
+    parser.add_argument('--synthetic', type=int, default=20, help='Number of synthetic instances')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed of the synthetic instances')
+    parser.add_argument('--bin_algo', type=str, default='BFF', choices=['BFF', 'BBF', 'BWF'],
+                        help='Bin selection heuristic')
+    parser.add_argument('--processes', type=int, default=None, help='Worker processes, the number of CPUs by default')
+    parser.add_argument('--table', type=str, default='selector_table.json', help='Performance table written')
+    args = parser.parse_args()
+
+    instances = []
+    for testcase_filename in sorted(os.listdir(args.testcase_folder)):
+        items, trucks = read_instance(os.path.join(args.testcase_folder, testcase_filename))
+        instances.append((testcase_filename, np.array(items), np.array(trucks)))
+
+    rng = np.random.default_rng(args.seed)
+    for i in range(args.synthetic):
+        items, trucks = synthetic_instance(rng)
+        instances.append((f"synthetic{i + 1:02d}", items, trucks))
+
+    selector = AlgorithmSelector()
+    for name, items, trucks in instances:
+        # Same truck pruning as heuristic.py
+        kept, _ = prune_heuristic_trucks(items, trucks)
+        trucks = trucks[kept]
+
+        start_time = time.time()
+        costs = member_costs(items, trucks, bin_algo=args.bin_algo, processes=args.processes)
+        end_time = time.time()
+
+        selector.add(name, instance_features(items, trucks), costs)
+        best = min((cost, member) for member, cost in costs.items() if cost is not None)
+        print(f"{name}: Best cost = {best[0]} with {' '.join(best[1])}, Time to run = {end_time - start_time:.4f} seconds")
+
+    selector.save(args.table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import sys
+import argparse
+import numpy as np
+from C2DLMC import *
+from C2DLMC.search import ruin_and_recreate
+from check_solution import read_instance
+
+
+def check_test_case(testcase_path, pack_algo, budget, seed):
+    """
+    Pack an instance, improve it with ruin and recreate, then pack it again
+    from scratch. The repairs must leave the bins given to the packer
+    untouched, so both pack() calls give the same cost.
+
+    Returns:
+        list: Description of each check that failed
+    """
+    items, trucks = read_instance(testcase_path)
+    items = np.array(items).reshape(len(items), 2)
+    W, L, c = zip(*trucks)
+
+    packer = newPacker(sort_algo=SORT_AREA, pack_algo=pack_algo, cost_aware=True)
+    packer.add_rects(items[:, 0], items[:, 1], np.arange(1, len(items) + 1))
+    packer.add_bins(W, L, c, bids=np.arange(1, len(trucks) + 1))
+
+    avail_bins = packer.avail_bin_list()
+    first_cost = packer.pack().total_cost
+    ruin_and_recreate(packer, budget, seed=seed)
+
+    failed = []
+    if packer.avail_bin_list() != avail_bins:
+        failed.append(f"available bins changed from {len(avail_bins)} "
+                      f"to {len(packer.avail_bin_list())} entries")
+
+    second_cost = packer.pack().total_cost
+    if second_cost != first_cost:
+        failed.append(f"pack() cost changed from {first_cost} to {second_cost}")
+
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that local search repairs don't change the packer input.")
+    parser.add_argument('testcases', nargs='+', help='Test case files')
+    parser.add_argument('--pack_algo', type=str, default='MaxRectsBaf', help='Packing algorithm to use')
+    parser.add_argument('--budget', type=float, default=2, help='Ruin and recreate time budget in seconds')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    args = parser.parse_args()
+
+    pack_algo_mapping = {
+        'SkylineBl': SkylineBl,
+        'MaxRectsBl': MaxRectsBl,
+        'MaxRectsBaf': MaxRectsBaf,
+        'MaxRectsBssf': MaxRectsBssf,
+        'MaxRectsBlsf': MaxRectsBlsf,
+        'GuillotineBafMaxas': GuillotineBafMaxas
+    }
+
+    ok = True
+    for testcase_path in args.testcases:
+        failed = check_test_case(testcase_path, pack_algo_mapping[args.pack_algo], args.budget, args.seed)
+        print(f"{testcase_path}: {'OK' if not failed else 'FAIL'}")
+        for message in failed:
+            print(f"    {message}")
+        ok = ok and not failed
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
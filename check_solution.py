@@ -0,0 +1,130 @@
+import re
+import sys
+import argparse
+from C2DLMC.validate import find_outside, find_collision
+
+
+def read_instance(instance_path):
+    with open(instance_path, 'r') as f:
+        lines = f.readlines()
+
+    N, K = map(int, lines[0].split())  # Number of items and trucks
+    items = [tuple(map(int, line.split())) for line in lines[1:N + 1]]
+    trucks = [tuple(map(int, line.split())) for line in lines[N + 1:N + 1 + K]]
+
+    return items, trucks
+
+
+def read_solution(solution_path):
+    """
+    Read the placements, lines with the format "rid truck x y rotated", and
+    the total cost if reported. Any other line is ignored.
+
+    Returns:
+        tuple (placements, reported_cost)
+    """
+    placements = []
+    reported_cost = None
+
+    with open(solution_path, 'r') as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) == 5 and all(re.fullmatch(r'-?\d+', v) for v in fields):
+                placements.append(tuple(map(int, fields)))
+                continue
+
+            match = re.search(r'Total cost\s*[:=]\s*(-?[\d.]+)', line)
+            if match:
+                reported_cost = float(match.group(1))
+
+    return placements, reported_cost
+
+
+def check_solution(items, trucks, placements, reported_cost=None):
+    """
+    Verify that every item is placed exactly once, with its own dimensions
+    or rotated, fully inside an existing truck and without overlapping other
+    items, and that the reported cost is the cost of the trucks used.
+
+    Returns:
+        tuple (errors, cost): List of error messages and the total cost of
+            the trucks used.
+    """
+    errors = []
+    placed = set()
+    truck_rects = {}  # Truck index: [(x, y, width, height), ...]
+    truck_rids = {}
+
+    for rid, truck, x, y, rotated in placements:
+        if not 1 <= rid <= len(items):
+            errors.append(f"Item {rid}: Unknown item")
+            continue
+        if rid in placed:
+            errors.append(f"Item {rid}: Placed more than once")
+            continue
+        placed.add(rid)
+
+        if not 1 <= truck <= len(trucks):
+            errors.append(f"Item {rid}: Unknown truck {truck}")
+            continue
+        if rotated not in (0, 1):
+            errors.append(f"Item {rid}: Rotation must be 0 or 1, found {rotated}")
+            continue
+
+        w, h = items[rid - 1]
+        if rotated:
+            w, h = h, w
+
+        truck_rects.setdefault(truck, []).append((x, y, w, h))
+        truck_rids.setdefault(truck, []).append(rid)
+
+    for rid in range(1, len(items) + 1):
+        if rid not in placed:
+            errors.append(f"Item {rid}: Not placed")
+
+    for truck, rects in truck_rects.items():
+        W, L, _ = trucks[truck - 1]
+        rids = truck_rids[truck]
+
+        # Report every item outside the truck, then check the rest overlap
+        inside = []
+        for i, rect in enumerate(rects):
+            if find_outside(W, L, [rect]) is None:
+                inside.append(i)
+            else:
+                errors.append(f"Item {rids[i]}: Placed at {rect} outside truck {truck} ({W}x{L})")
+
+        collision = find_collision([rects[i] for i in inside])
+        if collision is not None:
+            i, j = (inside[k] for k in collision)
+            errors.append(f"Items {rids[i]} and {rids[j]}: Overlap in truck {truck}")
+
+    cost = sum(trucks[truck - 1][2] for truck in truck_rects)
+    if reported_cost is not None and abs(reported_cost - cost) > 1e-6:
+        errors.append(f"Reported cost {reported_cost:g} differs from the cost of the trucks used {cost}")
+
+    return errors, cost
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check a solution in the 'rid truck x y rotated' format.")
+    parser.add_argument('instance', type=str, help='Test case file')
+    parser.add_argument('solution', type=str, help='Solution file, any line not in the placement format is ignored')
+    args = parser.parse_args()
+
+    items, trucks = read_instance(args.instance)
+    placements, reported_cost = read_solution(args.solution)
+    errors, cost = check_solution(items, trucks, placements, reported_cost)
+
+    for error in errors:
+        print(error)
+
+    if errors:
+        print(f"INVALID: {len(errors)} errors found")
+        sys.exit(1)
+
+    print(f"VALID: {len(items)} items in {len({p[1] for p in placements})} trucks, Total cost = {cost}")
+
+
+if __name__ == "__main__":
+    main()
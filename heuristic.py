@@ -1,66 +1,181 @@
 import os
 import time
 import argparse
+import numpy as np
 from C2DLMC import *
+from C2DLMC.preprocess import prune_heuristic_trucks
+from C2DLMC.postprocess import downgrade_bins
+from C2DLMC.search import ruin_and_recreate
+from C2DLMC.multistart import multi_start, pack_start
+from C2DLMC.portfolio import portfolio, PORTFOLIO_SORTS
+from C2DLMC.selector import AlgorithmSelector, instance_features
+from C2DLMC.bounds import lower_bound, gap
+from C2DLMC.oracle import FeasibilityOracle
+from C2DLMC.patterns import PatternLibrary
 
 # Default pack algorithm
 DEFAULT_PACK_ALGO = MaxRectsBaf
 
-def sort_trucks_by_effectiveness(trucks, items):
-    total_item_area = sum(w * l for w, l, _ in items)
+def write_solution(solution_path, result):
+    # One line per item with the format "rid truck x y rotated"
+    with open(solution_path, 'w') as f:
+        for rid, truck, x, y, rotated in zip(result.rid, result.rect_bid, result.x,
+                                             result.y, result.rotated):
+            f.write(f"{rid} {truck} {x} {y} {int(rotated)}\n")
+        f.write(f"Total cost: {result.total_cost}\n")
 
-    trucks_with_ratio = []
-    for truck in trucks:
-        W, L, c, truck_id = truck
-        truck_area = W * L
-        fit_ratio = min(total_item_area, truck_area) / truck_area
-        cost_effectiveness = truck_area / c
-        adjusted_ratio = fit_ratio * cost_effectiveness
-        trucks_with_ratio.append((truck, adjusted_ratio))
 
-    trucks_sorted = sorted(trucks_with_ratio, key=lambda x: x[1], reverse=True)
-
-    return [truck for truck, _ in trucks_sorted]
+def build_packer(items, trucks, pack_algo, bin_algo="BFF", sort_algo=SORT_AREA, patterns=None):
+    # Each time a truck is needed the one with the best cost for the item
+    # area left is opened.
+    packer = newPacker(bin_algo=bin_algo, sort_algo=sort_algo, pack_algo=pack_algo, cost_aware=True,
+                       patterns=patterns)
 
+    # Add items to the packing queue
+    packer.add_rects(items[:, 0], items[:, 1], np.arange(1, len(items) + 1))
 
-def process_test_case(testcase_path, pack_algo):
+    # Add bins (trucks) where the items will be placed
+    W, L, c, truck_id = zip(*trucks)
+    packer.add_bins(W, L, c, bids=truck_id)
+    return packer
+
+
+def process_test_case(testcase_path, pack_algo, bin_algo="BFF", deadline=None, solution_path=None,
+                      downgrade=False, search=None, seed=None, starts=None, processes=None,
+                      use_portfolio=False, selector=None, oracle=None, patterns=None):
+    """
+    Returns:
+        dict: Total cost, lower bound and gap, number of items left
+            unplaced, packing time and degraded flag, the starts run or portfolio winner, the engine and item
+            order chosen by the selector, and the saving and time of the
+            local search and downgrade passes when enabled.
+    """
     with open(testcase_path, 'r') as f:
         lines = f.readlines()
 
     N, K = map(int, lines[0].split())  # Number of items and trucks
-    items = [tuple(map(int, line.split())) + (i + 1,) for i, line in enumerate(lines[1:N + 1])]
+    items = np.array([line.split() for line in lines[1:N + 1]], dtype=np.int64).reshape(N, 2)
     trucks = [tuple(map(int, line.split())) + (i + 1,) for i, line in enumerate(lines[N + 1:N + 1 + K])]
 
-    # Initialize Packer
-    packer = newPacker(bin_algo="BFF", sort_algo=SORT_AREA, pack_algo=pack_algo)
+    # Drop dominated trucks and trucks that can't hold any item, the fits
+    # matrix of the trucks kept spares the packer its size checks.
+    kept, fits = prune_heuristic_trucks(items, [truck[:3] for truck in trucks])
+    trucks = [trucks[k] for k in kept]
 
-    # Add items to the packing queue
-    for item in items:
-        packer.add_rect(item[0], item[1], rid=item[2])
+    W, L, c, truck_id = zip(*trucks)
 
-    # Add bins (trucks) where the items will be placed
-    trucks = sort_trucks_by_effectiveness(trucks, items)
-    for truck in trucks:
-        packer.add_bin(*truck[:3], bid=truck[3])
+    # Lower bound on the cost, the gap to it is reported
+    bound = lower_bound(items, np.column_stack((W, L, c)))
 
-    # Start packing
     start_time = time.time()
-    packer.pack()
-    end_time = time.time()
-
-    packed_items = packer.rect_list()
-    packed_bins = packer.bin_list()
-
-    total_cost = sum(truck[2] for truck in trucks if any(p[0] == trucks.index(truck) for p in packed_items))
-    total_time = end_time - start_time
-
-    return total_cost, total_time
+    result = None
+    report = {}
+
+    if use_portfolio:
+        # Pack with every engine and item order, keep the cheapest
+        result, winner, _ = portfolio(
+            items, np.column_stack((W, L, c)), np.arange(1, N + 1), truck_id, deadline=deadline,
+            bin_algo=bin_algo, processes=processes)
+        end_time = time.time()
+
+        # When no member finished a full plan, the plain packing below is used
+        report.update(total_time=end_time - start_time, winner=None)
+        if result is not None:
+            report.update(degraded=result.degraded, winner=f"{winner[0].__name__} {winner[1]}")
+
+        # The passes below improve a packer, pack the winner again without
+        # deadline so a degraded plan isn't kept.
+        if result is not None and (search is not None or downgrade):
+            packer = build_packer(items, trucks, winner[0], bin_algo, PORTFOLIO_SORTS[winner[1]])
+            result = packer.pack(fits=fits)
+            report['degraded'] = result.degraded
+    elif starts is not None:
+        # Pack with many item orders, keep the cheapest
+        result, best_start, _, starts_run = multi_start(
+            items, np.column_stack((W, L, c)), np.arange(1, N + 1), truck_id, starts=starts,
+            pack_algo=pack_algo, bin_algo=bin_algo, seed=seed or 0, processes=processes)
+        end_time = time.time()
+
+        report.update(total_time=end_time - start_time, degraded=False, starts=starts_run)
+
+        # The passes below improve a packer, pack the best start again. When
+        # no start placed every item, the plain packing below is used.
+        if result is not None and (search is not None or downgrade):
+            packer = pack_start(items, np.column_stack((W, L, c)), np.arange(1, N + 1), truck_id,
+                                best_start, pack_algo, bin_algo, seed=seed or 0)
+
+    if result is None:
+        # Engine and item order chosen from the instance features
+        sort_algo = SORT_AREA
+        if selector is not None:
+            pack_algo, sort_name = selector.select(instance_features(items, np.column_stack((W, L, c))))
+            sort_algo = PORTFOLIO_SORTS[sort_name]
+
+        packer = build_packer(items, trucks, pack_algo, bin_algo, sort_algo, patterns)
+
+        # Start packing
+        result = packer.pack(deadline=None if deadline is None else deadline - (time.time() - start_time),
+                             fits=fits)
+        end_time = time.time()
+
+        report.update(total_time=end_time - start_time, degraded=result.degraded)
+        if selector is not None:
+            report['selected'] = f"{pack_algo.__name__} {sort_name}"
+
+    # Empty wasteful trucks and repack their items for the search time
+    if search is not None:
+        result, report['search_saving'], report['search_time'] = ruin_and_recreate(packer, search,
+                                                                                  seed=seed, lower_bound=bound)
+
+    # Move the load of partly filled trucks into cheaper ones
+    if downgrade:
+        result, report['downgrade_saving'], report['downgrade_time'] = downgrade_bins(packer, oracle=oracle)
+
+    # Keep the truck layouts for the next runs
+    if patterns is not None:
+        patterns.add_result(result)
+
+    # A plan missing items isn't a solution, it has no gap and isn't written
+    report['total_cost'] = result.total_cost
+    report['lower_bound'] = bound
+    report['unplaced'] = N - len(result)
+    report['gap'] = gap(result.total_cost, bound) if report['unplaced'] == 0 else None
+
+    if solution_path is not None and report['unplaced'] == 0:
+        write_solution(solution_path, result)
+
+    return report
 
 
 def main():
     # Argument parser setup
     parser = argparse.ArgumentParser(description="Process test cases with a specified packing algorithm.")
     parser.add_argument('--pack_algo', type=str, default='MaxRectsBaf', help='Packing algorithm to use')
+    parser.add_argument('--bin_algo', type=str, default='BFF', choices=['BFF', 'BBF', 'BWF'],
+                        help='Bin selection heuristic')
+    parser.add_argument('--deadline', type=float, default=None,
+                        help='Time budget in seconds for each test case, a fast fallback is used when exceeded')
+    parser.add_argument('--downgrade', action='store_true',
+                        help='Try to move the items of each truck into a cheaper one after packing')
+    parser.add_argument('--search', type=float, default=None,
+                        help='Seconds of ruin and recreate local search after packing')
+    parser.add_argument('--starts', type=int, default=None,
+                        help='Pack with this many randomized item orders and keep the cheapest')
+    parser.add_argument('--portfolio', action='store_true',
+                        help='Pack with every engine and sort order concurrently, keep the cheapest plan')
+    parser.add_argument('--select', nargs='?', const='selector_table.json', default=None,
+                        help='Choose the engine and sort order from the instance features, with the '
+                             'performance table written by calibrate_selector.py')
+    parser.add_argument('--oracle_cache', type=str, default=None,
+                        help='Repack with the exact feasibility oracle during --downgrade, its memo is kept in this file')
+    parser.add_argument('--patterns', type=str, default=None,
+                        help='Reuse the truck layouts kept in this file before packing, and add the new ones')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='Worker processes for --starts and --portfolio, the number of CPUs by default')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Random seed of the multi-start orders and the local search')
+    parser.add_argument('--solution_folder', type=str, default=None,
+                        help='Folder where the solution of each test case is written')
     parser.add_argument('--testcase_folder', type=str, default='testcase', help='Folder containing test cases')
     args = parser.parse_args()
 
@@ -75,12 +190,48 @@ def main():
     }
 
     pack_algo = pack_algo_mapping.get(args.pack_algo, DEFAULT_PACK_ALGO)
+    selector = AlgorithmSelector.load(args.select) if args.select is not None else None
+    oracle = FeasibilityOracle(path=args.oracle_cache) if args.oracle_cache is not None else None
+    patterns = PatternLibrary(path=args.patterns) if args.patterns is not None else None
 
     # Process each test case in the folder
     for testcase_filename in os.listdir(args.testcase_folder):
         testcase_path = os.path.join(args.testcase_folder, testcase_filename)
-        total_cost, total_time = process_test_case(testcase_path, pack_algo)
-        print(f"Test case {testcase_filename}: Total cost = {total_cost}, Time to run = {total_time:.4f} seconds")
+        solution_path = None
+        if args.solution_folder is not None:
+            os.makedirs(args.solution_folder, exist_ok=True)
+            solution_path = os.path.join(args.solution_folder, testcase_filename)
+
+        report = process_test_case(testcase_path, pack_algo, args.bin_algo, args.deadline,
+                                   solution_path, args.downgrade, args.search, args.seed,
+                                   args.starts, args.processes, args.portfolio, selector, oracle, patterns)
+        if report['unplaced']:
+            line = (f"Test case {testcase_filename}: Incomplete plan, {report['unplaced']} items not placed, "
+                    f"Time to run = {report['total_time']:.4f} seconds")
+        else:
+            line = (f"Test case {testcase_filename}: Total cost = {report['total_cost']}, "
+                    f"Lower bound = {report['lower_bound']}, Gap = {report['gap']:.2%}, "
+                    f"Time to run = {report['total_time']:.4f} seconds")
+        if report['degraded']:
+            line += " (degraded)"
+        if args.portfolio:
+            line += f", Winner = {report['winner']}"
+        elif args.starts is not None:
+            line += f", Starts = {report['starts']}"
+        elif selector is not None:
+            line += f", Selected = {report['selected']}"
+        if args.search is not None:
+            line += (f", Search saving = {report['search_saving']}, "
+                     f"Search time = {report['search_time']:.4f} seconds")
+        if args.downgrade:
+            line += (f", Downgrade saving = {report['downgrade_saving']}, "
+                     f"Downgrade time = {report['downgrade_time']:.4f} seconds")
+        print(line)
+
+    if oracle is not None:
+        oracle.save()
+    if patterns is not None:
+        patterns.save()
 
 
 if __name__ == "__main__":
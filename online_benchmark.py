@@ -0,0 +1,73 @@
+import time
+import random
+import argparse
+from C2DLMC import *
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run_benchmark(pack_algo, bin_algo, num_items, seed):
+    rng = random.Random(seed)
+
+    packer = newPacker(mode=PackingMode.Online, bin_algo=bin_algo, pack_algo=pack_algo)
+
+    # Trucks arrive in batches while packages are being scanned
+    truck_types = [(600, 400, 20), (580, 330, 15), (400, 300, 10)]
+
+    # Per item placement time grouped by the number of open bins at the
+    # moment the item was scanned.
+    latencies = {}
+    for i in range(num_items):
+        if i % 100 == 0:
+            for W, H, c in truck_types:
+                packer.add_bin(W, H, c, count=20)
+
+        w, h = rng.randint(10, 300), rng.randint(10, 200)
+        open_bins = packer.open_bin_count
+
+        start_time = time.perf_counter()
+        packer.add_rect(w, h, rid=i + 1)
+        end_time = time.perf_counter()
+
+        bucket = 1
+        while bucket <= open_bins:
+            bucket *= 10
+        latencies.setdefault(bucket, []).append(end_time - start_time)
+
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per item placement latency of the online packer.")
+    parser.add_argument('--pack_algo', type=str, default='MaxRectsBaf', help='Packing algorithm to use')
+    parser.add_argument('--bin_algo', type=str, default='BFF', choices=['BFF', 'BBF', 'BWF'],
+                        help='Bin selection heuristic')
+    parser.add_argument('--items', type=int, default=20000, help='Number of packages scanned')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    args = parser.parse_args()
+
+    pack_algo_mapping = {
+        'SkylineBl': SkylineBl,
+        'MaxRectsBl': MaxRectsBl,
+        'MaxRectsBaf': MaxRectsBaf,
+        'MaxRectsBssf': MaxRectsBssf,
+        'MaxRectsBlsf': MaxRectsBlsf,
+        'GuillotineBafMaxas': GuillotineBafMaxas
+    }
+
+    latencies = run_benchmark(pack_algo_mapping[args.pack_algo], args.bin_algo, args.items, args.seed)
+
+    print(f"{'Open bins':>12} {'Items':>8} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    lower = 0
+    for bucket in sorted(latencies):
+        values = latencies[bucket]
+        print(f"{f'{lower}-{bucket - 1}':>12} {len(values):>8} "
+              f"{percentile(values, 0.50) * 1000:>10.3f} {percentile(values, 0.99) * 1000:>10.3f}")
+        lower = bucket
+
+
+if __name__ == "__main__":
+    main()